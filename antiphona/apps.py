@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AntiphonaConfig(AppConfig):
     name = 'antiphona'
+
+    def ready(self) -> None:
+        from antiphona import receivers  # noqa: F401
@@ -0,0 +1,271 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import logging
+import math
+from types import SimpleNamespace
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    MutableMapping,
+    Optional,
+)
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    connections,
+)
+from django.http import parse_cookie
+from django.http.request import (
+    split_domain_port,
+    validate_host,
+)
+from django.urls import (
+    Resolver404,
+    resolve,
+    reverse,
+)
+from django.utils.functional import cached_property
+import pymongo
+from pymongo.database import Database
+from rest_framework.exceptions import (
+    APIException,
+    Throttled,
+)
+from rest_framework.renderers import JSONRenderer
+
+from antiphona import (
+    documents,
+    throttling,
+)
+from antiphona.models import (
+    Antiphona,
+    Celebration,
+)
+
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApplication = Callable[[Scope, Receive, Send], Awaitable[None]]
+Handler = Callable[[], Awaitable[tuple[int, Any]]]
+
+logger = logging.getLogger('django.request')
+
+LIST_ALLOW = 'GET, POST, HEAD, OPTIONS'
+DETAIL_ALLOW = 'GET, PUT, PATCH, DELETE, HEAD, OPTIONS'
+
+
+class MongoReader:
+    """
+    Runs blocking pymongo reads on a bounded pool of threads that share one MongoClient,
+    so waiting on Mongo does not hold the thread pool Django runs sync views in.
+    """
+
+    def __init__(self, using: Optional[str] = None, max_workers: Optional[int] = None) -> None:
+        # Requests served here never write, so they can always read from the read connection
+        self.using = using or settings.ANTIPHONA_READ_DATABASE or DEFAULT_DB_ALIAS
+        self.max_workers = max_workers or settings.ANTIPHONA_ASYNC_READ_WORKERS
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='mongo-read')
+
+    @cached_property
+    def database(self) -> Database:
+        settings_dict = connections.databases[self.using]
+        client: pymongo.MongoClient = pymongo.MongoClient(
+            **{'maxPoolSize': self.max_workers, **settings_dict.get('CLIENT', {})},
+        )
+        return client[settings_dict['NAME']]
+
+    async def find(self, collection_name: str, query: dict) -> list[dict]:
+        collection = self.database[collection_name]
+
+        def fetch() -> list[dict]:
+            return list(collection.find(query, {'_id': 0}))
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fetch)
+
+    async def find_one(self, collection_name: str, query: dict) -> Optional[dict]:
+        found = await self.find(collection_name, query)
+        return found[0] if found else None
+
+
+class AsyncReadApplication:
+    """
+    Serves JSON list and retrieve requests for antiphonas and celebrations straight from
+    Mongo without going through Django's sync request handling. Everything else, including
+    the browsable API and any request carrying credentials, is passed on to ``application``.
+
+    Requests served here are anonymous and throttled by client address, as
+    SharedMemoryRateThrottle throttles anonymous clients.
+    """
+
+    def __init__(self, application: ASGIApplication, reader: Optional[MongoReader] = None) -> None:
+        self.application = application
+        self.reader = reader or MongoReader()
+        self.renderer = JSONRenderer()
+        self.antiphonas_column = Celebration._meta.get_field('antiphonas').column
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route = self.get_handler(scope) if scope['type'] == 'http' else None
+        if route is None:
+            await self.application(scope, receive, send)
+            return
+
+        throttle_scope, allow, handler = route
+        headers = [
+            (b'content-type', b'application/json'),
+            (b'vary', b'Accept'),
+            (b'allow', allow.encode()),
+            (b'x-frame-options', b'DENY'),
+            (b'x-content-type-options', b'nosniff'),
+        ]
+        wait = throttling.check(throttle_scope, self.get_ident(scope))
+        if wait:
+            exception = Throttled(wait)
+            status, data = exception.status_code, {'detail': exception.detail}
+            headers.append((b'retry-after', str(math.ceil(wait)).encode()))
+        else:
+            try:
+                status, data = await handler()
+            except Exception:
+                logger.exception('Internal Server Error: %s', scope['path'])
+                exception = APIException()
+                status, data = exception.status_code, {'detail': exception.detail}
+
+        body = self.renderer.render(data)
+        headers.append((b'content-length', str(len(body)).encode()))
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers,
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': body if scope['method'] == 'GET' else b'',
+        })
+
+    @staticmethod
+    def has_credentials(headers: dict[bytes, bytes]) -> bool:
+        # Authenticated clients are throttled by user, which only Django can tell
+        if b'authorization' in headers:
+            return True
+        cookies = parse_cookie(headers.get(b'cookie', b'').decode('latin-1'))
+        return settings.SESSION_COOKIE_NAME in cookies
+
+    @staticmethod
+    def get_ident(scope: Scope) -> str:
+        # Same identity SharedMemoryRateThrottle gives anonymous clients, from what DRF's get_ident reads
+        headers = dict(scope['headers'])
+        meta = {'REMOTE_ADDR': scope['client'][0] if scope.get('client') else ''}
+        if b'x-forwarded-for' in headers:
+            meta['HTTP_X_FORWARDED_FOR'] = headers[b'x-forwarded-for'].decode('latin-1')
+        return 'ip:' + throttling.SharedMemoryRateThrottle().get_ident(SimpleNamespace(META=meta))
+
+    @staticmethod
+    def get_host(headers: dict[bytes, bytes]) -> Optional[str]:
+        """The Host header if HttpRequest.get_host would accept it, None otherwise."""
+        if settings.USE_X_FORWARDED_HOST:
+            return None
+        host = headers.get(b'host', b'').decode('latin-1')
+        allowed_hosts = settings.ALLOWED_HOSTS
+        if settings.DEBUG and not allowed_hosts:
+            allowed_hosts = ['.localhost', '127.0.0.1', '[::1]']
+        domain, _ = split_domain_port(host)
+        if domain and validate_host(domain, allowed_hosts):
+            return host
+        return None
+
+    def get_handler(self, scope: Scope) -> Optional[tuple[str, str, Handler]]:
+        """Returns the throttle scope, Allow header and handler for requests served here."""
+        if scope['method'] not in ('GET', 'HEAD'):
+            return None
+        headers = dict(scope['headers'])
+        if b'text/html' in headers.get(b'accept', b'') or self.has_credentials(headers):
+            return None
+        query = parse_qs(scope['query_string'].decode('latin-1'))
+        if query.get('format', ['json']) != ['json']:
+            return None
+        try:
+            match = resolve(scope['path'])
+        except Resolver404:
+            return None
+        if 'format' in match.kwargs:
+            return None
+        # Django answers disallowed hosts with a 400, and they must not end up in the urls built here
+        host = self.get_host(headers)
+        if host is None:
+            return None
+
+        base_url = f"{scope.get('scheme', 'http')}://{host}"
+        expand = query.get('expand') == ['antiphonas']
+
+        if match.url_name == 'antiphona-list':
+            return 'read', LIST_ALLOW, partial(self.list_antiphonas, base_url)
+        if match.url_name == 'antiphona-detail':
+            return 'read', DETAIL_ALLOW, partial(self.retrieve_antiphona, base_url, match.kwargs['pk'])
+        if match.url_name == 'celebration-list':
+            # Expanded lists export the whole collection and are throttled as such, like in the viewset
+            return 'bulk' if expand else 'read', LIST_ALLOW, partial(self.list_celebrations, base_url, expand)
+        if match.url_name == 'celebration-detail':
+            return 'read', DETAIL_ALLOW, partial(self.retrieve_celebration, base_url, match.kwargs['pk'], expand)
+        return None
+
+    @staticmethod
+    def parse_pk(pk: str) -> Optional[int]:
+        return int(pk) if pk.isdigit() else None
+
+    @staticmethod
+    def url_builder(base_url: str) -> documents.UrlBuilder:
+        return lambda view_name, pk: base_url + reverse(view_name, kwargs={'pk': pk})
+
+    def celebration_representations(
+        self,
+        base_url: str,
+        celebrations: list[dict],
+        expanded: Optional[dict[int, dict]] = None,
+    ) -> list[dict]:
+        return [
+            documents.representation(document, self.url_builder(base_url), expanded=expanded is not None)
+            for document in documents.assemble(celebrations, expanded)
+        ]
+
+    async def expand(self, celebrations: list[dict]) -> dict[int, dict]:
+        """Fetches the antiphonas of every celebration, one concurrent query per chunk of ids."""
+        ids = sorted({pk for document in celebrations for pk in document.get(self.antiphonas_column) or []})
+        chunk_size = settings.ANTIPHONA_EXPAND_CHUNK_SIZE
+        results = await asyncio.gather(*(
+            self.reader.find(Antiphona._meta.db_table, {'id': {'$in': ids[start:start + chunk_size]}})
+            for start in range(0, len(ids), chunk_size)
+        ))
+        return {document['id']: document for found in results for document in found}
+
+    async def list_antiphonas(self, base_url: str) -> tuple[int, Any]:
+        found = await self.reader.find(Antiphona._meta.db_table, {})
+        return 200, [documents.antiphona_representation(document, self.url_builder(base_url)) for document in found]
+
+    async def retrieve_antiphona(self, base_url: str, pk: str) -> tuple[int, Any]:
+        document = await self.reader.find_one(Antiphona._meta.db_table, {'id': self.parse_pk(pk)})
+        if document is None:
+            return 404, {'detail': 'Not found.'}
+        return 200, documents.antiphona_representation(document, self.url_builder(base_url))
+
+    async def list_celebrations(self, base_url: str, expand: bool) -> tuple[int, Any]:
+        found = await self.reader.find(Celebration._meta.db_table, {})
+        expanded = await self.expand(found) if expand else None
+        return 200, self.celebration_representations(base_url, found, expanded)
+
+    async def retrieve_celebration(self, base_url: str, pk: str, expand: bool) -> tuple[int, Any]:
+        if expand and settings.ANTIPHONA_CELEBRATION_DOCUMENTS:
+            denormalized = await self.reader.find_one(documents.COLLECTION, {'id': self.parse_pk(pk)})
+            if denormalized is not None:
+                return 200, documents.representation(denormalized, self.url_builder(base_url))
+
+        document = await self.reader.find_one(Celebration._meta.db_table, {'id': self.parse_pk(pk)})
+        if document is None:
+            return 404, {'detail': 'Not found.'}
+        expanded = await self.expand([document]) if expand else None
+        return 200, self.celebration_representations(base_url, [document], expanded)[0]
@@ -0,0 +1,90 @@
+from collections import Counter
+import time
+from typing import (
+    Callable,
+    Optional,
+)
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from pymongo import UpdateOne
+
+from antiphona import documents
+from antiphona.models import (
+    Antiphona,
+    Celebration,
+)
+
+
+def find_alive(ids: list[int], using: str, chunk_size: int) -> set[int]:
+    """Probes which of ``ids`` still exist, with one ``$in`` query per chunk."""
+    alive: set[int] = set()
+    for start in range(0, len(ids), chunk_size):
+        alive.update(
+            antiphona['id']
+            for antiphona in Antiphona.objects.db_manager(using).mongo_find(
+                {'id': {'$in': ids[start:start + chunk_size]}},
+                {'_id': 0, 'id': 1},
+            )
+        )
+    return alive
+
+
+def compact(
+    using: str = DEFAULT_DB_ALIAS,
+    batch_size: int = 500,
+    chunk_size: int = 1000,
+    dry_run: bool = False,
+    after: Optional[int] = None,
+    max_batches_per_second: Optional[float] = None,
+    on_batch: Optional[Callable[[Counter], None]] = None,
+) -> Counter:
+    """
+    Removes ids of deleted antiphonas from ``Celebration.antiphonas``, walking celebrations in
+    id order from ``after``. ``on_batch`` gets a copy of the running totals after every batch,
+    including the ``last_id`` to resume from.
+
+    ``using`` should be the primary: an antiphona missing from a lagging secondary is not dead.
+    """
+    column = documents.antiphonas_column()
+    celebrations = Celebration.objects.db_manager(using)
+    totals: Counter = Counter()
+    last_id = after
+
+    while True:
+        started = time.monotonic()
+        query = {} if last_id is None else {'id': {'$gt': last_id}}
+        batch = list(celebrations.mongo_find(query, {'_id': 0, 'id': 1, column: 1}).sort('id', 1).limit(batch_size))
+        if not batch:
+            break
+
+        referenced = sorted({pk for celebration in batch for pk in celebration.get(column) or []})
+        alive = find_alive(referenced, using, chunk_size)
+        dead = {
+            celebration['id']: sorted(set(celebration.get(column) or []) - alive)
+            for celebration in batch
+        }
+        dead = {pk: ids for pk, ids in dead.items() if ids}
+
+        if dead and not dry_run:
+            celebrations.mongo_bulk_write(
+                [UpdateOne({'id': pk}, {'$pull': {column: {'$in': ids}}}) for pk, ids in dead.items()],
+                ordered=False,
+            )
+            if settings.ANTIPHONA_CELEBRATION_DOCUMENTS:
+                documents.refresh(list(dead), using)
+
+        last_id = batch[-1]['id']
+        totals['batches'] += 1
+        totals['celebrations'] += len(batch)
+        totals['references'] += sum(len(celebration.get(column) or []) for celebration in batch)
+        totals['dead_references'] += sum(len(ids) for ids in dead.values())
+        totals['celebrations_compacted'] += len(dead)
+        totals['last_id'] = last_id
+        if on_batch is not None:
+            on_batch(Counter(totals))
+
+        if max_batches_per_second:
+            time.sleep(max(0.0, 1 / max_batches_per_second - (time.monotonic() - started)))
+
+    return totals
@@ -0,0 +1,161 @@
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Optional,
+)
+
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    connections,
+)
+from pymongo import (
+    DeleteOne,
+    ReplaceOne,
+)
+from pymongo.collection import Collection
+
+from antiphona.models import (
+    Antiphona,
+    Celebration,
+)
+
+
+# Read model: one document per celebration with the antiphonas it references embedded in it
+COLLECTION = 'antiphona_celebration_document'
+
+# Antiphona fields embedded in the documents
+ANTIPHONA_FIELDS = ('id', 'text', 'link')
+
+# Builds an absolute url from a view name and a primary key
+UrlBuilder = Callable[[str, Any], str]
+
+
+def get_collection(using: str = DEFAULT_DB_ALIAS) -> Collection:
+    return connections[using].cursor().db_conn[COLLECTION]
+
+
+def antiphonas_column() -> str:
+    return Celebration._meta.get_field('antiphonas').column
+
+
+def assemble(celebrations: list[dict], antiphonas: Optional[dict[int, dict]] = None) -> list[dict]:
+    """
+    Turns raw celebration documents into read documents, embedding the given antiphonas by id.
+    Without ``antiphonas`` only their ids are embedded, enough for unexpanded representations.
+    """
+    column = antiphonas_column()
+    return [
+        {
+            'id': celebration['id'],
+            'liturgical_season': celebration['liturgical_season'],
+            'name': celebration['name'],
+            'antiphonas': [
+                {'id': pk} if antiphonas is None else {field: antiphonas[pk][field] for field in ANTIPHONA_FIELDS}
+                for pk in sorted(celebration.get(column) or [])
+                if antiphonas is None or pk in antiphonas
+            ],
+        }
+        for celebration in celebrations
+    ]
+
+
+def build_documents(celebrations: list[dict], using: str = DEFAULT_DB_ALIAS) -> list[dict]:
+    """Same as ``assemble``, with a single query for every antiphona referenced."""
+    column = antiphonas_column()
+    ids = {pk for celebration in celebrations for pk in celebration.get(column) or []}
+    antiphonas = {
+        antiphona['id']: antiphona
+        for antiphona in Antiphona.objects.db_manager(using).mongo_find(
+            {'id': {'$in': list(ids)}},
+            {'_id': 0, **{field: 1 for field in ANTIPHONA_FIELDS}},
+        )
+    }
+    return assemble(celebrations, antiphonas)
+
+
+def refresh(celebration_ids: Iterable[int], using: str = DEFAULT_DB_ALIAS) -> None:
+    """Rebuilds the documents of the given celebrations, dropping those whose celebration is gone."""
+    ids = list(celebration_ids)
+    if not ids:
+        return
+    celebrations = list(Celebration.objects.db_manager(using).mongo_find({'id': {'$in': ids}}, {'_id': 0}))
+    documents = build_documents(celebrations, using)
+
+    found = {document['id'] for document in documents}
+    operations: list = [ReplaceOne({'id': document['id']}, document, upsert=True) for document in documents]
+    operations += [DeleteOne({'id': pk}) for pk in ids if pk not in found]
+    get_collection(using).bulk_write(operations, ordered=False)
+
+
+def refresh_for_antiphona(antiphona_id: int, using: str = DEFAULT_DB_ALIAS, batch_size: int = 500) -> None:
+    """Fans out an antiphona change to every celebration referencing it, found through the reverse index."""
+    cursor = Celebration.objects.db_manager(using).mongo_find({antiphonas_column(): antiphona_id}, {'_id': 0, 'id': 1})
+    batch: list[int] = []
+    for celebration in cursor:
+        batch.append(celebration['id'])
+        if len(batch) >= batch_size:
+            refresh(batch, using)
+            batch = []
+    refresh(batch, using)
+
+
+def delete(celebration_id: int, using: str = DEFAULT_DB_ALIAS) -> None:
+    get_collection(using).delete_one({'id': celebration_id})
+
+
+def rebuild(using: str = DEFAULT_DB_ALIAS, batch_size: int = 500) -> int:
+    """Recreates every document from scratch and removes orphans. Returns how many were written."""
+    written = 0
+    last_id = None
+    while True:
+        query = {} if last_id is None else {'id': {'$gt': last_id}}
+        celebrations = list(
+            Celebration.objects.db_manager(using).mongo_find(query, {'_id': 0}).sort('id', 1).limit(batch_size),
+        )
+        if not celebrations:
+            break
+        last_id = celebrations[-1]['id']
+        documents = build_documents(celebrations, using)
+        get_collection(using).bulk_write(
+            [ReplaceOne({'id': document['id']}, document, upsert=True) for document in documents],
+            ordered=False,
+        )
+        written += len(documents)
+
+    existing = {celebration['id'] for celebration in Celebration.objects.db_manager(using).mongo_find({}, {'id': 1})}
+    orphans = [
+        document['id']
+        for document in get_collection(using).find({}, {'id': 1})
+        if document['id'] not in existing
+    ]
+    if orphans:
+        get_collection(using).delete_many({'id': {'$in': orphans}})
+    return written
+
+
+def get_document(celebration_id: int, using: str = DEFAULT_DB_ALIAS) -> Optional[dict]:
+    return get_collection(using).find_one({'id': celebration_id}, {'_id': 0})
+
+
+def antiphona_representation(antiphona: dict, build_url: UrlBuilder) -> dict:
+    """Same shape as AntiphonaSerializer."""
+    return {
+        'url': build_url('antiphona-detail', antiphona['id']),
+        'text': antiphona['text'],
+        'link': antiphona['link'],
+    }
+
+
+def representation(document: dict, build_url: UrlBuilder, expanded: bool = True) -> dict:
+    """Same shape as ExpandedCelebrationSerializer, or CelebrationSerializer when not ``expanded``."""
+    return {
+        'url': build_url('celebration-detail', document['id']),
+        'liturgical_season': document['liturgical_season'],
+        'name': document['name'],
+        'antiphonas': [
+            antiphona_representation(antiphona, build_url) if expanded
+            else build_url('antiphona-detail', antiphona['id'])
+            for antiphona in document['antiphonas']
+        ],
+    }
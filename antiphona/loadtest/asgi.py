@@ -0,0 +1,87 @@
+import asyncio
+import itertools
+import json
+import time
+from typing import (
+    Any,
+    Sequence,
+)
+
+from antiphona.asgi import (
+    ASGIApplication,
+    Message,
+)
+from antiphona.loadtest.runner import summarize
+
+
+async def request(
+    application: ASGIApplication,
+    path: str,
+    query_string: str = '',
+    accept: bytes = b'application/json',
+    host: bytes = b'localhost',
+    headers: Sequence[tuple[bytes, bytes]] = (),
+) -> tuple[int, Any]:
+    """Issues a GET against an ASGI application in process, without any network in between."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string.encode(),
+        'root_path': '',
+        'headers': [(b'host', host), (b'accept', accept), *headers],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    received = False
+    messages: list[Message] = []
+
+    async def receive() -> Message:
+        nonlocal received
+        if received:
+            return {'type': 'http.disconnect'}
+        received = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    await application(scope, receive, send)
+    status = messages[0]['status']
+    headers = {name.lower(): value for name, value in messages[0].get('headers', [])}
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    if body and b'json' in headers.get(b'content-type', b''):
+        return status, json.loads(body)
+    return status, body
+
+
+async def benchmark(
+    application: ASGIApplication,
+    targets: Sequence[tuple[str, str]],
+    concurrency: int,
+    requests: int,
+) -> dict[str, Any]:
+    """Cycles through ``targets`` (path, query string) with ``concurrency`` requests in flight."""
+    pending = itertools.islice(itertools.cycle(targets), requests)
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for path, query_string in pending:
+            started = time.perf_counter()
+            try:
+                status, _ = await request(application, path, query_string)
+            except Exception:
+                status = 500
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, len(latencies), time.perf_counter() - started)
@@ -0,0 +1,263 @@
+import base64
+from collections import (
+    Counter,
+    defaultdict,
+)
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import json
+import math
+import random
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Optional,
+    Sequence,
+)
+from urllib.parse import urlsplit
+
+from antiphona.loadtest.scenarios import (
+    Response,
+    Scenario,
+)
+
+
+PERCENTILES = {'p50': 0.50, 'p95': 0.95, 'p99': 0.99}
+
+
+class Client:
+    """
+    Minimal keep-alive JSON client. It is not thread safe, each worker gets its own.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        timeout: float = 10.0,
+    ) -> None:
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.headers = {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+        }
+        if username is not None:
+            credentials = f'{username}:{password or ""}'.encode()
+            self.headers['Authorization'] = 'Basic ' + base64.b64encode(credentials).decode()
+        self.requests_sent = 0
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    def _path(self, url: str) -> str:
+        # Hyperlinked serializers return absolute urls; only the path is relevant to us.
+        parts = urlsplit(url)
+        path = parts.path
+        if parts.query:
+            path = f'{path}?{parts.query}'
+        if parts.netloc:
+            return path
+        return self.prefix + path
+
+    def request(self, method: str, url: str, body: Any = None) -> Response:
+        payload = json.dumps(body).encode() if body is not None else None
+        if self._connection is None:
+            self._connection = self._connect()
+        self.requests_sent += 1
+        try:
+            self._connection.request(method, self._path(url), body=payload, headers=self.headers)
+            response = self._connection.getresponse()
+            raw = response.read()
+        except (http.client.HTTPException, OSError):
+            self.close()
+            raise
+        data = None
+        if raw and 'json' in response.getheader('Content-Type', ''):
+            data = json.loads(raw)
+        return Response(response.status, data)
+
+    def get(self, url: str) -> Response:
+        return self.request('GET', url)
+
+    def post(self, url: str, body: Any) -> Response:
+        return self.request('POST', url, body)
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def summarize(latencies: Sequence[float], errors: int, http_requests: int, elapsed: float) -> dict[str, Any]:
+    values = sorted(latencies)
+    count = len(values)
+    latency_ms = {
+        name: round(percentile(values, fraction) * 1000, 3)
+        for name, fraction in PERCENTILES.items()
+    }
+    latency_ms['mean'] = round(sum(values) / count * 1000, 3) if count else 0.0
+    latency_ms['max'] = round(values[-1] * 1000, 3) if count else 0.0
+    return {
+        'requests': count,
+        'http_requests': http_requests,
+        'errors': errors,
+        'error_rate': round(errors / count, 6) if count else 0.0,
+        'throughput_rps': round(count / elapsed, 3) if elapsed else 0.0,
+        'latency_ms': latency_ms,
+    }
+
+
+class Recorder:
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, Counter] = defaultdict(Counter)
+        self.http_requests: Counter = Counter()
+
+    def record(self, scenario: str, latency: float, http_requests: int, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.latencies[scenario].append(latency)
+            self.http_requests[scenario] += http_requests
+            if error is not None:
+                self.errors[scenario][error] += 1
+
+    def report(self, elapsed: float) -> dict[str, Any]:
+        scenarios = {}
+        for name in sorted(self.latencies):
+            scenarios[name] = summarize(
+                self.latencies[name],
+                sum(self.errors[name].values()),
+                self.http_requests[name],
+                elapsed,
+            )
+            scenarios[name]['error_kinds'] = dict(self.errors[name])
+
+        total = summarize(
+            [latency for latencies in self.latencies.values() for latency in latencies],
+            sum(sum(errors.values()) for errors in self.errors.values()),
+            sum(self.http_requests.values()),
+            elapsed,
+        )
+        return {'total': total, 'scenarios': scenarios}
+
+
+class LoadTest:
+    """
+    Runs weighted scenarios from ``concurrency`` worker threads until ``duration`` seconds
+    have passed or ``requests`` scenario runs were issued, whichever comes first.
+
+    When ``rate`` is given, runs are scheduled at a fixed pace and latency is measured from
+    the scheduled start, so a slow server is not hidden by workers falling behind.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Client],
+        scenarios: Sequence[tuple[Scenario, int]],
+        concurrency: int = 10,
+        rate: Optional[float] = None,
+        duration: Optional[float] = None,
+        requests: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        if not scenarios:
+            raise ValueError("At least one scenario is required")
+        if duration is None and requests is None:
+            raise ValueError("Either duration or requests must be set")
+        self.client_factory = client_factory
+        self.scenarios = [scenario for scenario, _ in scenarios]
+        self.weights = [weight for _, weight in scenarios]
+        self.concurrency = concurrency
+        self.rate = rate
+        self.duration = duration
+        self.requests = requests
+        self.seed = seed
+        self.recorder = Recorder()
+        self._lock = threading.Lock()
+        self._issued = 0
+        self._start = 0.0
+
+    def _next_slot(self) -> Optional[float]:
+        """Claims the next run and returns when it should start, or None when we are done."""
+        with self._lock:
+            if self.requests is not None and self._issued >= self.requests:
+                return None
+            index = self._issued
+            self._issued += 1
+        scheduled = self._start + index / self.rate if self.rate else time.perf_counter()
+        if self.duration is not None and scheduled - self._start >= self.duration:
+            return None
+        return scheduled
+
+    def _worker(self, number: int) -> None:
+        rng = random.Random(None if self.seed is None else self.seed + number)
+        client = self.client_factory()
+        try:
+            while True:
+                scheduled = self._next_slot()
+                if scheduled is None:
+                    return
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                started = scheduled if self.rate else time.perf_counter()
+                scenario = rng.choices(self.scenarios, weights=self.weights)[0]
+                sent = client.requests_sent
+                error = None
+                try:
+                    scenario.run(client, rng)
+                except Exception as exc:
+                    # Any failure is a data point, not a reason to stop the run
+                    error = str(getattr(exc, 'kind', type(exc).__name__))
+                self.recorder.record(
+                    scenario.name,
+                    time.perf_counter() - started,
+                    client.requests_sent - sent,
+                    error,
+                )
+        finally:
+            client.close()
+
+    def run(self) -> dict[str, Any]:
+        setup_client = self.client_factory()
+        try:
+            for scenario in self.scenarios:
+                scenario.setup(setup_client)
+        finally:
+            setup_client.close()
+
+        self._start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for future in [executor.submit(self._worker, number) for number in range(self.concurrency)]:
+                future.result()
+        elapsed = time.perf_counter() - self._start
+
+        report = self.recorder.report(elapsed)
+        report['config'] = {
+            'scenarios': dict(zip((scenario.name for scenario in self.scenarios), self.weights)),
+            'concurrency': self.concurrency,
+            'rate': self.rate,
+            'duration': self.duration,
+            'requests': self.requests,
+        }
+        report['elapsed_s'] = round(elapsed, 3)
+        return report
@@ -0,0 +1,131 @@
+import random
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    NamedTuple,
+)
+
+
+if TYPE_CHECKING:
+    from antiphona.loadtest.runner import Client
+
+
+class Response(NamedTuple):
+    status: int
+    data: Any
+
+
+class ScenarioError(Exception):
+
+    def __init__(self, message: str, kind: str = 'scenario') -> None:
+        super().__init__(message)
+        self.kind = kind
+
+
+def expect(response: Response, *statuses: int) -> Response:
+    if response.status not in statuses:
+        raise ScenarioError(f"Unexpected status {response.status}", kind=str(response.status))
+    return response
+
+
+class Scenario:
+    """
+    A unit of work issued against the API. ``setup`` runs once before the load starts,
+    ``run`` is called concurrently from every worker and must not mutate shared state.
+    """
+
+    name = ''
+
+    def setup(self, client: 'Client') -> None:
+        pass
+
+    def run(self, client: 'Client', rng: random.Random) -> None:
+        raise NotImplementedError
+
+
+class ListAntiphonas(Scenario):
+    name = 'list_antiphonas'
+
+    def run(self, client: 'Client', rng: random.Random) -> None:
+        expect(client.get('/antiphonas/'), 200)
+
+
+class ListCelebrations(Scenario):
+    name = 'list_celebrations'
+
+    def run(self, client: 'Client', rng: random.Random) -> None:
+        expect(client.get('/celebrations/'), 200)
+
+
+class RetrieveScenario(Scenario):
+    list_url = ''
+
+    def setup(self, client: 'Client') -> None:
+        response = expect(client.get(self.list_url), 200)
+        self.urls = [item['url'] for item in response.data]
+        if not self.urls:
+            raise ScenarioError(f"{self.list_url} is empty, seed the database first")
+
+
+class RetrieveAntiphona(RetrieveScenario):
+    name = 'retrieve_antiphona'
+    list_url = '/antiphonas/'
+
+    def run(self, client: 'Client', rng: random.Random) -> None:
+        expect(client.get(rng.choice(self.urls)), 200)
+
+
+class RetrieveCelebration(RetrieveScenario):
+    name = 'retrieve_celebration'
+    list_url = '/celebrations/'
+
+    def run(self, client: 'Client', rng: random.Random) -> None:
+        expect(client.get(rng.choice(self.urls)), 200)
+
+
+class ExpandedCelebration(RetrieveScenario):
+    """What a client does to render a celebration: fetch it, then every antiphona in it."""
+
+    name = 'expanded_celebration'
+    list_url = '/celebrations/'
+
+    def run(self, client: 'Client', rng: random.Random) -> None:
+        celebration = expect(client.get(rng.choice(self.urls)), 200).data
+        for url in celebration['antiphonas']:
+            expect(client.get(url), 200)
+
+
+class ServerExpandedCelebration(RetrieveScenario):
+    name = 'server_expanded_celebration'
+    list_url = '/celebrations/'
+
+    def run(self, client: 'Client', rng: random.Random) -> None:
+        expect(client.get(rng.choice(self.urls) + '?expand=antiphonas'), 200)
+
+
+class CreateAntiphona(Scenario):
+    name = 'create_antiphona'
+
+    def run(self, client: 'Client', rng: random.Random) -> None:
+        number = rng.getrandbits(64)
+        body = {
+            'text': {'la': f'Antiphona {number}', 'en_US': f'Antiphon {number}'},
+            'link': f'https://example.com/loadtest/{number}',
+        }
+        expect(client.post('/antiphonas/', body), 201)
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        ListAntiphonas,
+        ListCelebrations,
+        RetrieveAntiphona,
+        RetrieveCelebration,
+        ExpandedCelebration,
+        ServerExpandedCelebration,
+        CreateAntiphona,
+    )
+}
+
+READ_SCENARIOS = [name for name in SCENARIOS if name != CreateAntiphona.name]
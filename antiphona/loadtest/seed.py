@@ -0,0 +1,31 @@
+import random
+
+from antiphona.models import (
+    VALID_LANGUAGES,
+    Antiphona,
+    Celebration,
+    LiturgicalSeasons,
+)
+
+
+def seed(antiphonas: int, celebrations: int, antiphonas_per_celebration: int, rng: random.Random) -> None:
+    """Fills the database with predictable looking data for the load scenarios to hit."""
+    languages = sorted(VALID_LANGUAGES)
+    # Links are unique, upserting lets the database be seeded again
+    created = [
+        Antiphona.objects.upsert(
+            link=f'https://example.com/seed/{number}',
+            text={language: f'Antiphona {number} ({language})' for language in languages},
+        )[0]
+        for number in range(antiphonas)
+    ]
+    if not created:
+        return
+
+    seasons = [season for season, _ in LiturgicalSeasons.choices]
+    for number in range(celebrations):
+        Celebration.objects.create(
+            name=f'Celebration {number}',
+            liturgical_season=rng.choice(seasons),
+            antiphonas=rng.sample(created, k=min(antiphonas_per_celebration, len(created))),
+        )
@@ -0,0 +1,13 @@
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from antiphona.models import Antiphona
+
+
+class Command(BaseCommand):
+    help = "Lists links shared by more than one antiphona, as JSON."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        self.stdout.write(json.dumps(Antiphona.objects.duplicates(), indent=2))
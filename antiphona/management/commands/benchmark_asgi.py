@@ -0,0 +1,81 @@
+import asyncio
+import json
+import random
+from typing import Any
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.test import override_settings
+
+from antiphona.asgi import AsyncReadApplication
+from antiphona.loadtest.asgi import benchmark
+from antiphona.loadtest.seed import seed
+from antiphona.models import (
+    Antiphona,
+    Celebration,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares concurrent read throughput of the sync Django views against the async "
+        "read path, both served in process through ASGI."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--seed-antiphonas', type=int, default=0, help="Antiphonas to create before running")
+        parser.add_argument('--seed-celebrations', type=int, default=0)
+        parser.add_argument('--antiphonas-per-celebration', type=int, default=10)
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['seed_antiphonas'] or options['seed_celebrations']:
+            seed(
+                options['seed_antiphonas'],
+                options['seed_celebrations'],
+                options['antiphonas_per_celebration'],
+                random.Random(),
+            )
+
+        antiphona_ids = list(Antiphona.objects.values_list('id', flat=True)[:100])
+        celebration_ids = list(Celebration.objects.values_list('id', flat=True)[:100])
+        if not antiphona_ids or not celebration_ids:
+            raise CommandError("The database is empty, seed it with --seed-antiphonas and --seed-celebrations")
+
+        targets = [('/antiphonas/', '')]
+        targets += [(f'/antiphonas/{pk}/', '') for pk in antiphona_ids]
+        targets += [(f'/celebrations/{pk}/', '') for pk in celebration_ids]
+        targets += [(f'/celebrations/{pk}/', 'expand=antiphonas') for pk in celebration_ids]
+
+        django_application = get_asgi_application()
+        report: dict[str, Any] = {}
+        # Every request comes from the same client, throttling would only measure 429s
+        without_throttling = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_CLASSES': [],
+            'DEFAULT_THROTTLE_RATES': {},
+        }
+        with override_settings(REST_FRAMEWORK=without_throttling):
+            for name, application in (
+                ('sync', django_application),
+                ('async', AsyncReadApplication(django_application)),
+            ):
+                report[name] = asyncio.run(
+                    benchmark(application, targets, options['concurrency'], options['requests']),
+                )
+        sync_throughput = report['sync']['throughput_rps']
+        report['speedup'] = round(report['async']['throughput_rps'] / sync_throughput, 3) if sync_throughput else None
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output)
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,82 @@
+from collections import Counter
+import json
+import os
+import time
+from typing import (
+    Any,
+    Optional,
+)
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandParser,
+)
+from django.db import DEFAULT_DB_ALIAS
+
+from antiphona.compaction import compact
+
+
+class Command(BaseCommand):
+    help = (
+        "Removes ids of deleted antiphonas from celebrations in batches. Safe to run against the "
+        "live database: it is rate limited and can be resumed with --after or --checkpoint."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=500, help="Celebrations scanned per batch")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Antiphona ids probed per $in query")
+        parser.add_argument('--dry-run', action='store_true', help="Report dead references without removing them")
+        parser.add_argument('--after', type=int, help="Resume after this celebration id")
+        parser.add_argument(
+            '--checkpoint',
+            help="File keeping the last processed celebration id, read on start and removed once done",
+        )
+        parser.add_argument('--max-batches-per-second', type=float)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def read_checkpoint(self, path: Optional[str]) -> Optional[int]:
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path) as checkpoint:
+            return int(checkpoint.read().strip())
+
+    def write_checkpoint(self, path: str, last_id: int) -> None:
+        with open(f'{path}.tmp', 'w') as checkpoint:
+            checkpoint.write(str(last_id))
+        os.replace(f'{path}.tmp', path)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        checkpoint = options['checkpoint'] if not options['dry_run'] else None
+        after = options['after']
+        if after is None:
+            after = self.read_checkpoint(checkpoint)
+        if after is not None:
+            self.stdout.write(f"Resuming after celebration {after}")
+        started = time.monotonic()
+
+        def on_batch(totals: Counter) -> None:
+            if checkpoint is not None:
+                self.write_checkpoint(checkpoint, totals['last_id'])
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                "batch {batches}: {celebrations} celebrations scanned, {dead_references} dead references in "
+                "{celebrations_compacted} celebrations, last id {last_id} ({rate:.1f} celebrations/s)".format(
+                    rate=totals['celebrations'] / elapsed if elapsed else 0.0,
+                    **totals,
+                ),
+            )
+
+        totals = compact(
+            using=options['database'],
+            batch_size=options['batch_size'],
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+            after=after,
+            max_batches_per_second=options['max_batches_per_second'],
+            on_batch=on_batch,
+        )
+
+        if checkpoint is not None and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        summary = {'dry_run': options['dry_run'], 'seconds': round(time.monotonic() - started, 3), **totals}
+        self.stdout.write(json.dumps(summary))
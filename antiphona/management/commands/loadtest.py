@@ -0,0 +1,101 @@
+import json
+import random
+from typing import Any
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from antiphona.loadtest.runner import (
+    Client,
+    LoadTest,
+)
+from antiphona.loadtest.scenarios import (
+    READ_SCENARIOS,
+    SCENARIOS,
+    Scenario,
+    ScenarioError,
+)
+from antiphona.loadtest.seed import seed
+
+
+def parse_scenario(value: str) -> tuple[Scenario, int]:
+    name, _, weight = value.partition('=')
+    if name not in SCENARIOS:
+        raise CommandError(f"Unknown scenario {name}. Choose from {', '.join(SCENARIOS)}")
+    try:
+        return SCENARIOS[name](), int(weight or 1)
+    except ValueError:
+        raise CommandError(f"Invalid weight for scenario {name}: {weight}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs a load test against a running server and prints throughput, latency "
+        "percentiles and error rates as JSON. The server throttles the load like any other client, "
+        "start it with ANTIPHONA_THROTTLE_READ, ANTIPHONA_THROTTLE_WRITE and ANTIPHONA_THROTTLE_BULK "
+        "raised to measure past them."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base url of the server")
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios', metavar='NAME[=WEIGHT]',
+            help=f"Repeatable. One of {', '.join(SCENARIOS)}. Defaults to every read scenario",
+        )
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--rate', type=float, help="Scenario runs per second. Unbounded if not set")
+        parser.add_argument('--duration', type=float, help="Seconds to run for")
+        parser.add_argument('--requests', type=int, help="Scenario runs to issue")
+        parser.add_argument('--username', help="Basic auth user, needed by write scenarios")
+        parser.add_argument('--password')
+        parser.add_argument('--timeout', type=float, default=10.0)
+        parser.add_argument('--random-seed', type=int)
+        parser.add_argument('--seed-antiphonas', type=int, default=0, help="Antiphonas to create before running")
+        parser.add_argument('--seed-celebrations', type=int, default=0)
+        parser.add_argument('--antiphonas-per-celebration', type=int, default=10)
+        parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        scenarios = [parse_scenario(value) for value in options['scenarios'] or READ_SCENARIOS]
+        duration = options['duration']
+        if duration is None and options['requests'] is None:
+            duration = 30.0
+
+        if options['seed_antiphonas'] or options['seed_celebrations']:
+            seed(
+                options['seed_antiphonas'],
+                options['seed_celebrations'],
+                options['antiphonas_per_celebration'],
+                random.Random(options['random_seed']),
+            )
+
+        def client_factory() -> Client:
+            return Client(
+                options['url'],
+                username=options['username'],
+                password=options['password'],
+                timeout=options['timeout'],
+            )
+
+        load_test = LoadTest(
+            client_factory,
+            scenarios,
+            concurrency=options['concurrency'],
+            rate=options['rate'],
+            duration=duration,
+            requests=options['requests'],
+            seed=options['random_seed'],
+        )
+        try:
+            report = json.dumps(load_test.run(), indent=2)
+        except ScenarioError as exc:
+            raise CommandError(str(exc))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report)
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,21 @@
+from typing import Any
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandParser,
+)
+from django.db import DEFAULT_DB_ALIAS
+
+from antiphona import documents
+
+
+class Command(BaseCommand):
+    help = "Rebuilds every denormalized celebration document and removes the ones left without a celebration."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        written = documents.rebuild(options['database'], options['batch_size'])
+        self.stdout.write(f"Rebuilt {written} celebration documents")
@@ -0,0 +1,22 @@
+from typing import Callable
+
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+)
+
+from antiphona.routers import pinned_to_primary
+
+
+class PrimaryPinningMiddleware:
+    """Starts every request reading from secondaries, whatever the previous one on this thread did."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        token = pinned_to_primary.set(False)
+        try:
+            return self.get_response(request)
+        finally:
+            pinned_to_primary.reset(token)
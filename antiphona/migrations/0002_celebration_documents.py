@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.state import StateApps
+
+
+CELEBRATION_DOCUMENTS = 'antiphona_celebration_document'
+
+
+def create_indexes(apps: StateApps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    database = schema_editor.connection.cursor().db_conn
+    Celebration = apps.get_model('antiphona', 'Celebration')
+    # Reverse index from an antiphona to the celebrations referencing it
+    database[Celebration._meta.db_table].create_index(
+        Celebration._meta.get_field('antiphonas').column,
+        name='celebration_antiphonas_idx',
+    )
+    database[CELEBRATION_DOCUMENTS].create_index('id', unique=True, name='celebration_document_id_uniq')
+
+
+def drop_indexes(apps: StateApps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    database = schema_editor.connection.cursor().db_conn
+    Celebration = apps.get_model('antiphona', 'Celebration')
+    database[Celebration._meta.db_table].drop_index('celebration_antiphonas_idx')
+    database.drop_collection(CELEBRATION_DOCUMENTS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('antiphona', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
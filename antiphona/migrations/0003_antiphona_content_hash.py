@@ -0,0 +1,79 @@
+from collections.abc import Mapping
+import hashlib
+import json
+from typing import Any
+
+from django.db import (
+    migrations,
+    models,
+)
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.migrations.state import StateApps
+from pymongo import UpdateOne
+
+
+def content_hash(text: Any, link: Any) -> str:
+    """Copy of antiphona.models.content_hash as of this migration, which must not follow later changes."""
+    if isinstance(text, Mapping):
+        text = {str(key): value for key, value in text.items()}
+    canonical = json.dumps(
+        {'link': link, 'text': text},
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def fill_content_hash(apps: StateApps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    Antiphona = apps.get_model('antiphona', 'Antiphona')
+    collection = schema_editor.connection.cursor().db_conn[Antiphona._meta.db_table]
+    operations = [
+        UpdateOne(
+            {'_id': document['_id']},
+            {'$set': {'content_hash': content_hash(document.get('text', {}), document.get('link', ''))}},
+        )
+        for document in collection.find({}, {'text': 1, 'link': 1})
+    ]
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+
+
+def create_indexes(apps: StateApps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    Antiphona = apps.get_model('antiphona', 'Antiphona')
+    collection = schema_editor.connection.cursor().db_conn[Antiphona._meta.db_table]
+    # Link is the natural key upserts go by. Antiphonas without a link are left out.
+    # Fails if a link is shared: merge the antiphonas listed by antiphona_duplicates first.
+    collection.create_index(
+        'link',
+        unique=True,
+        partialFilterExpression={'link': {'$gt': ''}},
+        name='antiphona_link_uniq',
+    )
+    # Upserts compare hashes from the index without touching the documents
+    collection.create_index([('link', 1), ('content_hash', 1), ('id', 1)], name='antiphona_link_content_hash_idx')
+
+
+def drop_indexes(apps: StateApps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    Antiphona = apps.get_model('antiphona', 'Antiphona')
+    collection = schema_editor.connection.cursor().db_conn[Antiphona._meta.db_table]
+    collection.drop_index('antiphona_link_uniq')
+    collection.drop_index('antiphona_link_content_hash_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('antiphona', '0002_celebration_documents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='antiphona',
+            name='content_hash',
+            field=models.CharField(default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(fill_content_hash, migrations.RunPython.noop),
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -1,12 +1,29 @@
+from collections import Counter
+from collections.abc import Mapping
+import hashlib
+import json
 from typing import (
     Any,
     Callable,
+    Iterable,
+    Optional,
 )
 
+from django.db import (
+    connections,
+    router,
+)
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from djongo import models
+from djongo.models.fields import ArrayReferenceDescriptor
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
-from antiphona import validators
+from antiphona import (
+    signals,
+    validators,
+)
 
 
 VALID_LANGUAGES = {'es_AR', 'es_MX', 'es_ES', 'es_US', 'en_US', 'la'}
@@ -24,6 +41,73 @@ def inject_validator_enforcement(field: models.Field) -> models.Field:
     return field
 
 
+def content_hash(text: Any, link: Any) -> str:
+    """Canonical sha256 over an antiphona's text and link, stable across key order."""
+    if isinstance(text, Mapping):
+        # Keys are stringified so invalid texts still hash and reach the validators
+        text = {str(key): value for key, value in text.items()}
+    canonical = json.dumps(
+        {'link': link, 'text': text},
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class SignalingArrayReferenceDescriptor(ArrayReferenceDescriptor):
+    """
+    The forward manager's add, remove, clear and set write straight to Mongo without saving
+    the instance, so they send ``array_references_set`` once they are done.
+    """
+
+    @cached_property
+    def related_manager_cls(self) -> type:
+        manager_cls = super().related_manager_cls
+
+        class SignalingArrayReferenceManager(manager_cls):  # type: ignore
+            # set goes through clear, add and remove, which must not send one signal each
+            nested = 0
+
+            def changed(self) -> None:
+                if self.nested:
+                    return
+                model = self.instance.__class__
+                signals.array_references_set.send(
+                    sender=model,
+                    instance=self.instance,
+                    using=router.db_for_write(model, instance=self.instance),
+                )
+
+            def add(self, *objs: Any) -> None:
+                super().add(*objs)
+                self.changed()
+
+            def remove(self, *objs: Any) -> None:
+                super().remove(*objs)
+                self.changed()
+
+            def clear(self) -> None:
+                super().clear()
+                self.changed()
+
+            def set(self, objs: Iterable, *, clear: bool = False) -> None:
+                self.nested += 1
+                try:
+                    super().set(objs, clear=clear)
+                finally:
+                    self.nested -= 1
+                self.changed()
+
+        return SignalingArrayReferenceManager
+
+
+def send_array_references_set(field: models.ArrayReferenceField) -> models.ArrayReferenceField:
+    field.forward_related_accessor_class = SignalingArrayReferenceDescriptor
+    return field
+
+
 class SupportARFQuerySet(models.QuerySet):
     def create(self, **kwargs: Any) -> models.Model:
         # We pop and save the values sent to ArrayReferenceFields
@@ -44,7 +128,127 @@ class SupportARFQuerySet(models.QuerySet):
         return created
 
 
-SupportARFManager = models.Manager.from_queryset(SupportARFQuerySet)
+SupportARFManager = models.DjongoManager.from_queryset(SupportARFQuerySet)
+
+
+class AntiphonaQuerySet(models.QuerySet):
+    batch_size = 500
+
+    def _existing_by_link(self, links: Iterable[str]) -> dict[str, dict]:
+        # Covered by the (link, content_hash, id) index
+        using = router.db_for_write(self.model)
+        return {
+            document['link']: document
+            for document in self.model.objects.db_manager(using).mongo_find(
+                {'link': {'$in': list(links)}},
+                {'_id': 0, 'id': 1, 'link': 1, 'content_hash': 1},
+            )
+        }
+
+    @staticmethod
+    def _check_link(link: str) -> None:
+        # Antiphonas without a link are not unique, so there would be no telling which to update
+        if not link:
+            raise ValueError("Upserts need a link, it is the key antiphonas are matched by")
+
+    def _next_id(self, using: str) -> int:
+        # The same counter djongo takes AutoField values from on insert
+        auto = connections[using].cursor().db_conn['__schema__'].find_one_and_update(
+            {'name': self.model._meta.db_table, 'auto': {'$exists': True}},
+            {'$inc': {'auto.seq': 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        return auto['auto']['seq']
+
+    def _insert(self, link: str, text: dict) -> Optional[models.Model]:
+        """
+        Inserts the antiphona in a single upsert on its link, so concurrent imports of a new link
+        cannot both create it. Returns None if another writer got there first.
+        """
+        using = router.db_for_write(self.model)
+        instance = self.model(text=text, link=link, content_hash=content_hash(text, link))
+        # get_prep_value runs the field validators, as it does on save
+        document = {
+            field.column: field.get_prep_value(field.value_from_object(instance))
+            for field in self.model._meta.concrete_fields
+            if not field.primary_key
+        }
+        document['id'] = self._next_id(using)
+        try:
+            result = self.model.objects.db_manager(using).mongo_update_one(
+                {'link': link},
+                {'$setOnInsert': document},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return None
+        if result.upserted_id is None:
+            return None
+        instance.pk = document['id']
+        instance._state.adding = False
+        instance._state.db = using
+        return instance
+
+    def _upsert(self, existing: dict[str, dict], link: str, text: dict) -> tuple[models.Model, str]:
+        using = router.db_for_write(self.model)
+        if link not in existing:
+            created = self._insert(link, text)
+            if created is not None:
+                existing[link] = {'id': created.pk, 'link': link, 'content_hash': created.content_hash}
+                return created, 'created'
+            # Created by someone else since it was looked up
+            existing.update(self._existing_by_link([link]))
+
+        found = existing[link]
+        instance = self.model(pk=found['id'], text=text, link=link)
+        if found.get('content_hash') == content_hash(text, link):
+            return instance, 'unchanged'
+        instance.save(force_update=True, using=using)
+        found['content_hash'] = instance.content_hash
+        return instance, 'updated'
+
+    def upsert(self, link: str, text: dict) -> tuple[models.Model, str]:
+        """
+        Creates or updates the antiphona with this link, skipping the write when its content
+        did not change. Returns the antiphona and one of 'created', 'updated' or 'unchanged'.
+        """
+        self._check_link(link)
+        return self._upsert(self._existing_by_link([link]), link, text)
+
+    def bulk_upsert(self, items: Iterable[Mapping]) -> Counter:
+        """Upserts every ``{'link': ..., 'text': ...}`` item, looking up a whole batch at once."""
+        counts: Counter = Counter()
+        items = list(items)
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start:start + self.batch_size]
+            for item in batch:
+                self._check_link(item['link'])
+            existing = self._existing_by_link(item['link'] for item in batch)
+            for item in batch:
+                _, status = self._upsert(existing, item['link'], item.get('text', {}))
+                counts[status] += 1
+        return counts
+
+    def duplicates(self) -> list[dict]:
+        """Links shared by more than one antiphona, with their ids and content hashes."""
+        using = router.db_for_read(self.model)
+        return list(self.model.objects.db_manager(using).mongo_aggregate([
+            # Same documents as the partial unique index on link, antiphonas without one may repeat
+            {'$match': {'link': {'$gt': ''}}},
+            {'$sort': {'link': 1}},
+            {'$group': {
+                '_id': '$link',
+                'count': {'$sum': 1},
+                'ids': {'$push': '$id'},
+                'content_hashes': {'$addToSet': '$content_hash'},
+            }},
+            {'$match': {'count': {'$gt': 1}}},
+            {'$project': {'_id': 0, 'link': '$_id', 'count': 1, 'ids': 1, 'content_hashes': 1}},
+            {'$sort': {'count': -1, 'link': 1}},
+        ]))
+
+
+AntiphonaManager = models.DjongoManager.from_queryset(AntiphonaQuerySet)
 
 
 class Antiphona(models.Model):
@@ -60,6 +264,16 @@ class Antiphona(models.Model):
         ),
     )
     link = inject_validator_enforcement(models.URLField())
+    content_hash = models.CharField(max_length=64, default='', editable=False)
+
+    objects = AntiphonaManager()
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        self.content_hash = content_hash(self.text, self.link)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'text', 'link'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'content_hash'}
+        super().save(*args, **kwargs)
 
 
 class LiturgicalSeasons(models.TextChoices):
@@ -76,9 +290,11 @@ class Celebration(models.Model):
         max_length=9,
     )
     name = models.CharField(max_length=40)
-    antiphonas = models.ArrayReferenceField(
-        to=Antiphona,
-        on_delete=models.DO_NOTHING,
+    antiphonas = send_array_references_set(
+        models.ArrayReferenceField(
+            to=Antiphona,
+            on_delete=models.DO_NOTHING,
+        ),
     )
 
     objects = SupportARFManager()
@@ -0,0 +1,10 @@
+from rest_framework.permissions import DjangoModelPermissionsOrAnonReadOnly
+
+
+class UpsertPermissions(DjangoModelPermissionsOrAnonReadOnly):
+    """An upsert POST may update existing objects, so it needs the change permission as well."""
+
+    perms_map = {
+        **DjangoModelPermissionsOrAnonReadOnly.perms_map,
+        'POST': ['%(app_label)s.add_%(model_name)s', '%(app_label)s.change_%(model_name)s'],
+    }
@@ -0,0 +1,37 @@
+from typing import Any
+
+from django.conf import settings
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+)
+from django.dispatch import receiver
+
+from antiphona import (
+    documents,
+    signals,
+)
+from antiphona.models import (
+    Antiphona,
+    Celebration,
+)
+
+
+@receiver(post_save, sender=Celebration)
+@receiver(signals.array_references_set, sender=Celebration)
+def refresh_celebration_document(sender: type, instance: Celebration, using: str, **kwargs: Any) -> None:
+    if settings.ANTIPHONA_CELEBRATION_DOCUMENTS and not kwargs.get('raw'):
+        documents.refresh([instance.pk], using)
+
+
+@receiver(post_delete, sender=Celebration)
+def delete_celebration_document(sender: type, instance: Celebration, using: str, **kwargs: Any) -> None:
+    if settings.ANTIPHONA_CELEBRATION_DOCUMENTS:
+        documents.delete(instance.pk, using)
+
+
+@receiver(post_save, sender=Antiphona)
+@receiver(post_delete, sender=Antiphona)
+def refresh_antiphona_celebrations(sender: type, instance: Antiphona, using: str, **kwargs: Any) -> None:
+    if settings.ANTIPHONA_CELEBRATION_DOCUMENTS and not kwargs.get('raw'):
+        documents.refresh_for_antiphona(instance.pk, using)
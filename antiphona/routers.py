@@ -0,0 +1,45 @@
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Optional,
+)
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+# Set once the current request, or command, writes. Reset per request by PrimaryPinningMiddleware
+pinned_to_primary: ContextVar[bool] = ContextVar('pinned_to_primary', default=False)
+
+
+class ReadReplicaRouter:
+    """
+    Sends reads of antiphona models to ``settings.ANTIPHONA_READ_DATABASE``, a connection
+    preferring secondaries, and writes to the primary. Once a request writes, its remaining
+    reads stay on the primary so editors see their own changes.
+
+    Other apps, sessions and auth among them, are left to the primary: a session read from a
+    lagging secondary right after login would log the editor out.
+    """
+
+    app_label = 'antiphona'
+
+    def db_for_read(self, model: type, **hints: Any) -> Optional[str]:
+        if model._meta.app_label != self.app_label:
+            return None
+        if settings.ANTIPHONA_READ_DATABASE is None or pinned_to_primary.get():
+            return DEFAULT_DB_ALIAS
+        return settings.ANTIPHONA_READ_DATABASE
+
+    def db_for_write(self, model: type, **hints: Any) -> Optional[str]:
+        if model._meta.app_label != self.app_label:
+            return None
+        pinned_to_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> bool:
+        # Both aliases point to the same database
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, model_name: Optional[str] = None, **hints: Any) -> bool:
+        return db == DEFAULT_DB_ALIAS
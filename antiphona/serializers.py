@@ -1,8 +1,11 @@
+from typing import Any
+
 from djongo import models
 from rest_framework import (
     fields,
     serializers,
 )
+from rest_framework.validators import UniqueValidator
 
 from antiphona.models import (
     Antiphona,
@@ -18,9 +21,37 @@ class AntiphonaSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Antiphona
         fields = ['url', 'text', 'link']
+        # Unique in Mongo as the natural key of upserts, see AntiphonaQuerySet.upsert
+        extra_kwargs = {'link': {'validators': [UniqueValidator(queryset=Antiphona.objects.all())]}}
+
+
+class AntiphonaUpsertSerializer(AntiphonaSerializer):
+    class Meta(AntiphonaSerializer.Meta):
+        fields = ['text', 'link']
+        # Existing links are updated instead
+        extra_kwargs = {'link': {'validators': []}}
 
 
 class CelebrationSerializer(serializers.HyperlinkedModelSerializer):
+    # ArrayReferenceField looks like a ForeignKey to DRF, so the to-many relation is declared by hand
+    antiphonas = serializers.HyperlinkedRelatedField(
+        many=True,
+        queryset=Antiphona.objects.all(),
+        view_name='antiphona-detail',
+    )
+
     class Meta:
         model = Celebration
         fields = ['url', 'liturgical_season', 'name', 'antiphonas']
+
+    def update(self, instance: Celebration, validated_data: dict[str, Any]) -> Celebration:
+        # ModelSerializer.update would only setattr the list, which never reaches Mongo
+        antiphonas = validated_data.pop('antiphonas', None)
+        instance = super().update(instance, validated_data)
+        if antiphonas is not None:
+            instance.antiphonas.set(antiphonas, clear=True)
+        return instance
+
+
+class ExpandedCelebrationSerializer(CelebrationSerializer):
+    antiphonas = AntiphonaSerializer(many=True, read_only=True)
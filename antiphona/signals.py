@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+
+# Sent once a forward ArrayReferenceField manager has written its values to Mongo, with ``instance`` and ``using``
+array_references_set = Signal()
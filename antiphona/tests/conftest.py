@@ -0,0 +1,11 @@
+from typing import Iterator
+
+from django.test import override_settings
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def throttle_buckets(tmp_path_factory: pytest.TempPathFactory) -> Iterator[None]:
+    """Buckets of their own for every run, the default file is shared with any server on the host."""
+    with override_settings(ANTIPHONA_THROTTLE_PATH=str(tmp_path_factory.mktemp('throttle') / 'buckets')):
+        yield
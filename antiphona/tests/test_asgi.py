@@ -0,0 +1,138 @@
+import asyncio
+from typing import Any
+
+from django.core.asgi import get_asgi_application
+from django.test import (
+    TestCase,
+    override_settings,
+)
+
+from antiphona import documents
+from antiphona.asgi import (
+    AsyncReadApplication,
+    Message,
+    Receive,
+    Scope,
+    Send,
+)
+from antiphona.loadtest.asgi import request
+from antiphona.models import (
+    Celebration,
+    LiturgicalSeasons,
+)
+from antiphona.tests.factories.model_factories import AntiphonaFactory
+
+
+class RecordingApplication:
+
+    def __init__(self) -> None:
+        self.paths: list[str] = []
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.paths.append(scope['path'])
+        message: Message = {'type': 'http.response.start', 'status': 204, 'headers': []}
+        await send(message)
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+class TestAsyncReadApplication(TestCase):
+
+    def setUp(self) -> None:
+        self.antiphonas = [AntiphonaFactory(), AntiphonaFactory()]
+        self.celebration = Celebration.objects.create(
+            name="Valid name",
+            liturgical_season=LiturgicalSeasons.ADVENT,
+            antiphonas=self.antiphonas,
+        )
+        self.sync_application = get_asgi_application()
+        self.application = AsyncReadApplication(self.sync_application)
+
+    def get(self, application: Any, path: str, query_string: str = '') -> tuple[int, Any]:
+        return asyncio.run(request(application, path, query_string, host=b'testserver'))
+
+    def assert_same_as_sync(self, path: str, query_string: str = '') -> Any:
+        status, data = self.get(self.application, path, query_string)
+        assert (status, data) == self.get(self.sync_application, path, query_string)
+        return data
+
+    def test_retrieve_antiphona(self) -> None:
+        data = self.assert_same_as_sync(f'/antiphonas/{self.antiphonas[0].pk}/')
+        assert data['text'] == self.antiphonas[0].text
+
+    def test_list_antiphonas(self) -> None:
+        data = self.assert_same_as_sync('/antiphonas/')
+        urls = {item['url'] for item in data}
+        assert f'http://testserver/antiphonas/{self.antiphonas[1].pk}/' in urls
+
+    def test_retrieve_celebration(self) -> None:
+        data = self.assert_same_as_sync(f'/celebrations/{self.celebration.pk}/')
+        assert len(data['antiphonas']) == 2
+
+    def test_retrieve_expanded_celebration(self) -> None:
+        data = self.assert_same_as_sync(f'/celebrations/{self.celebration.pk}/', 'expand=antiphonas')
+        assert [antiphona['link'] for antiphona in data['antiphonas']] == [
+            antiphona.link for antiphona in self.antiphonas
+        ]
+
+    def test_list_expanded_celebrations(self) -> None:
+        self.assert_same_as_sync('/celebrations/', 'expand=antiphonas')
+
+    def test_missing_celebration(self) -> None:
+        status, data = self.get(self.application, '/celebrations/999999999/')
+        assert status == 404
+        assert data == {'detail': 'Not found.'}
+
+    def test_mongo_errors_give_a_json_500(self) -> None:
+        async def fail(collection_name: str, query: dict) -> list[dict]:
+            raise ConnectionError("Mongo is down")
+
+        self.application.reader.find = fail  # type: ignore
+
+        status, data = self.get(self.application, '/antiphonas/')
+
+        assert status == 500
+        assert data == {'detail': 'A server error occurred.'}
+
+
+@override_settings(ANTIPHONA_CELEBRATION_DOCUMENTS=True)
+class TestAsyncReadApplicationWithDocuments(TestAsyncReadApplication):
+
+    def assert_same_as_sync(self, path: str, query_string: str = '') -> Any:
+        # Both paths may answer from the documents, so they are also compared with the serializers
+        data = super().assert_same_as_sync(path, query_string)
+        with override_settings(ANTIPHONA_CELEBRATION_DOCUMENTS=False):
+            assert self.get(self.sync_application, path, query_string) == (200, data)
+        return data
+
+    def test_retrieve_expanded_celebration(self) -> None:
+        assert documents.get_document(self.celebration.pk) is not None
+        super().test_retrieve_expanded_celebration()
+
+
+class TestAsyncReadApplicationRouting(TestCase):
+
+    def setUp(self) -> None:
+        self.inner = RecordingApplication()
+        self.application = AsyncReadApplication(self.inner)
+
+    def test_browsable_api_is_passed_on(self) -> None:
+        asyncio.run(request(self.application, '/antiphonas/', accept=b'text/html'))
+        assert self.inner.paths == ['/antiphonas/']
+
+    def test_other_formats_are_passed_on(self) -> None:
+        asyncio.run(request(self.application, '/antiphonas/', 'format=api'))
+        assert self.inner.paths == ['/antiphonas/']
+
+    def test_disallowed_hosts_are_passed_on(self) -> None:
+        asyncio.run(request(self.application, '/antiphonas/', host=b'evil.example'))
+        assert self.inner.paths == ['/antiphonas/']
+
+    def test_requests_with_credentials_are_passed_on(self) -> None:
+        # Django throttles them by user, serving them here would throttle them by address
+        asyncio.run(request(self.application, '/antiphonas/', headers=[(b'authorization', b'Basic YTpi')]))
+        asyncio.run(request(self.application, '/antiphonas/', headers=[(b'cookie', b'sessionid=abc')]))
+        assert self.inner.paths == ['/antiphonas/', '/antiphonas/']
+
+    def test_unknown_paths_are_passed_on(self) -> None:
+        asyncio.run(request(self.application, '/admin/'))
+        assert self.inner.paths == ['/admin/']
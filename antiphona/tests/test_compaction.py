@@ -0,0 +1,66 @@
+from django.test import TestCase
+
+from antiphona import documents
+from antiphona.compaction import compact
+from antiphona.models import (
+    Celebration,
+    LiturgicalSeasons,
+)
+from antiphona.tests.factories.model_factories import AntiphonaFactory
+
+
+class TestCompact(TestCase):
+
+    def setUp(self) -> None:
+        self.kept = AntiphonaFactory()
+        self.deleted = AntiphonaFactory()
+        self.celebration = Celebration.objects.create(
+            name="Valid name",
+            liturgical_season=LiturgicalSeasons.ADVENT,
+            antiphonas=[self.kept, self.deleted],
+        )
+        self.deleted_pk = self.deleted.pk
+        self.deleted.delete()
+
+    def stored_ids(self) -> list[int]:
+        celebration = Celebration.objects.mongo_find_one({'id': self.celebration.pk})
+        return sorted(celebration[documents.antiphonas_column()])
+
+    def test_dead_references_are_removed(self) -> None:
+        totals = compact(after=self.celebration.pk - 1)
+
+        assert self.stored_ids() == [self.kept.pk]
+        assert totals['dead_references'] == 1
+        assert totals['celebrations_compacted'] == 1
+        assert totals['last_id'] >= self.celebration.pk
+
+    def test_dry_run_does_not_write(self) -> None:
+        totals = compact(after=self.celebration.pk - 1, dry_run=True)
+
+        assert self.stored_ids() == sorted([self.kept.pk, self.deleted_pk])
+        assert totals['dead_references'] == 1
+
+    def test_resumes_after_the_given_id(self) -> None:
+        totals = compact(after=self.celebration.pk)
+
+        assert self.stored_ids() == sorted([self.kept.pk, self.deleted_pk])
+        assert totals['celebrations'] == 0
+
+    def test_small_batches_and_chunks(self) -> None:
+        other = Celebration.objects.create(
+            name="Other name",
+            liturgical_season=LiturgicalSeasons.LENT,
+            antiphonas=[self.kept],
+        )
+        Celebration.objects.mongo_update_one(
+            {'id': other.pk},
+            {'$push': {documents.antiphonas_column(): self.deleted_pk}},
+        )
+        batches: list = []
+
+        compact(after=self.celebration.pk - 1, batch_size=1, chunk_size=1, on_batch=batches.append)
+
+        assert self.stored_ids() == [self.kept.pk]
+        assert [batch['last_id'] for batch in batches] == [self.celebration.pk, other.pk]
+        assert [batch['batches'] for batch in batches] == [1, 2]
+        assert [batch['dead_references'] for batch in batches] == [1, 2]
@@ -0,0 +1,108 @@
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from rest_framework.test import APIClient
+
+from antiphona import documents
+from antiphona.models import (
+    Celebration,
+    LiturgicalSeasons,
+)
+from antiphona.tests.factories.model_factories import AntiphonaFactory
+
+
+@override_settings(ANTIPHONA_CELEBRATION_DOCUMENTS=True)
+class TestCelebrationDocuments(TestCase):
+
+    def setUp(self) -> None:
+        self.antiphona_1 = AntiphonaFactory()
+        self.antiphona_2 = AntiphonaFactory()
+        self.celebration = Celebration.objects.create(
+            name="Valid name",
+            liturgical_season=LiturgicalSeasons.ADVENT,
+            antiphonas=[self.antiphona_1, self.antiphona_2],
+        )
+
+    def embedded_links(self) -> list[str]:
+        document = documents.get_document(self.celebration.pk)
+        assert document is not None
+        return [antiphona['link'] for antiphona in document['antiphonas']]
+
+    def test_document_is_created_with_the_celebration(self) -> None:
+        document = documents.get_document(self.celebration.pk)
+
+        assert document is not None
+        assert document['name'] == "Valid name"
+        assert document['antiphonas'] == [
+            {'id': self.antiphona_1.pk, 'text': self.antiphona_1.text, 'link': self.antiphona_1.link},
+            {'id': self.antiphona_2.pk, 'text': self.antiphona_2.text, 'link': self.antiphona_2.link},
+        ]
+
+    def test_celebration_changes_are_applied(self) -> None:
+        self.celebration.name = "Another name"
+        self.celebration.save()
+
+        document = documents.get_document(self.celebration.pk)
+        assert document is not None
+        assert document['name'] == "Another name"
+
+    def test_antiphonas_manager_changes_are_applied(self) -> None:
+        antiphona_3 = AntiphonaFactory()
+
+        self.celebration.antiphonas.add(antiphona_3)
+        assert self.embedded_links() == [self.antiphona_1.link, self.antiphona_2.link, antiphona_3.link]
+
+        self.celebration.antiphonas.remove(self.antiphona_1)
+        assert self.embedded_links() == [self.antiphona_2.link, antiphona_3.link]
+
+        self.celebration.antiphonas.set([self.antiphona_1], clear=True)
+        assert self.embedded_links() == [self.antiphona_1.link]
+
+        self.celebration.antiphonas.clear()
+        assert self.embedded_links() == []
+
+    def test_antiphona_changes_fan_out(self) -> None:
+        self.antiphona_2.link = "https://gregobase.selapa.net/chant.php?id=7911"
+        self.antiphona_2.save()
+
+        assert self.embedded_links() == [self.antiphona_1.link, "https://gregobase.selapa.net/chant.php?id=7911"]
+
+    def test_deleted_antiphona_is_removed(self) -> None:
+        self.antiphona_1.delete()
+
+        assert self.embedded_links() == [self.antiphona_2.link]
+
+    def test_deleted_celebration_removes_the_document(self) -> None:
+        pk = self.celebration.pk
+        self.celebration.delete()
+
+        assert documents.get_document(pk) is None
+
+    def test_rebuild_repairs_missing_documents(self) -> None:
+        documents.get_collection().delete_many({})
+
+        written = documents.rebuild()
+
+        assert written >= 1
+        assert self.embedded_links() == [self.antiphona_1.link, self.antiphona_2.link]
+
+    def test_expanded_retrieve_is_served_from_the_document(self) -> None:
+        documents.get_collection().update_one({'id': self.celebration.pk}, {'$set': {'name': "From the document"}})
+
+        response = APIClient().get(f'/celebrations/{self.celebration.pk}/', {'expand': 'antiphonas'})
+
+        assert response.status_code == 200
+        assert response.json()['name'] == "From the document"
+        assert [antiphona['link'] for antiphona in response.json()['antiphonas']] == [
+            self.antiphona_1.link,
+            self.antiphona_2.link,
+        ]
+
+
+class TestCelebrationDocumentsDisabled(TestCase):
+
+    def test_no_document_is_kept(self) -> None:
+        celebration = Celebration.objects.create(name="Valid name", liturgical_season=LiturgicalSeasons.LENT)
+
+        assert documents.get_document(celebration.pk) is None
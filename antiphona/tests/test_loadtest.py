@@ -0,0 +1,110 @@
+import random
+from typing import Any
+
+from django.test import TestCase
+import pytest
+
+from antiphona.loadtest.runner import (
+    Client,
+    LoadTest,
+    percentile,
+    summarize,
+)
+from antiphona.loadtest.scenarios import (
+    ExpandedCelebration,
+    Response,
+    Scenario,
+    ScenarioError,
+)
+
+
+class FakeClient(Client):
+
+    def __init__(self, responses: dict[str, Response]) -> None:
+        super().__init__('http://testserver')
+        self.responses = responses
+
+    def request(self, method: str, url: str, body: Any = None) -> Response:
+        self.requests_sent += 1
+        return self.responses[self._path(url)]
+
+
+class FailingScenario(Scenario):
+    name = 'failing'
+
+    def run(self, client: Client, rng: random.Random) -> None:
+        raise ScenarioError("Unexpected status 500", kind='500')
+
+
+class TestPercentile(TestCase):
+
+    def test_empty_values(self) -> None:
+        assert percentile([], 0.5) == 0.0
+
+    def test_nearest_rank(self) -> None:
+        values = [float(value) for value in range(1, 101)]
+        assert percentile(values, 0.50) == 50.0
+        assert percentile(values, 0.95) == 95.0
+        assert percentile(values, 0.99) == 99.0
+
+    def test_single_value(self) -> None:
+        assert percentile([3.0], 0.99) == 3.0
+
+
+class TestSummarize(TestCase):
+
+    def test_summary(self) -> None:
+        summary = summarize([0.002, 0.001, 0.003, 0.004], errors=1, http_requests=8, elapsed=2.0)
+
+        assert summary['requests'] == 4
+        assert summary['http_requests'] == 8
+        assert summary['error_rate'] == 0.25
+        assert summary['throughput_rps'] == 2.0
+        assert summary['latency_ms']['p50'] == 2.0
+        assert summary['latency_ms']['p99'] == 4.0
+        assert summary['latency_ms']['max'] == 4.0
+
+
+class TestLoadTest(TestCase):
+
+    def test_requires_an_end_condition(self) -> None:
+        with pytest.raises(ValueError, match="duration or requests"):
+            LoadTest(Client, [(FailingScenario(), 1)])
+
+    def test_expanded_celebration_fetches_every_antiphona(self) -> None:
+        responses = {
+            '/celebrations/': Response(200, [{'url': 'http://testserver/celebrations/1/'}]),
+            '/celebrations/1/': Response(200, {
+                'antiphonas': ['http://testserver/antiphonas/1/', 'http://testserver/antiphonas/2/'],
+            }),
+            '/antiphonas/1/': Response(200, {}),
+            '/antiphonas/2/': Response(200, {}),
+        }
+
+        report = LoadTest(
+            lambda: FakeClient(responses),
+            [(ExpandedCelebration(), 1)],
+            concurrency=2,
+            requests=10,
+        ).run()
+
+        assert report['total']['requests'] == 10
+        assert report['total']['http_requests'] == 30
+        assert report['total']['errors'] == 0
+
+    def test_errors_are_reported_by_kind(self) -> None:
+        report = LoadTest(
+            lambda: FakeClient({}),
+            [(FailingScenario(), 1)],
+            concurrency=3,
+            requests=6,
+        ).run()
+
+        assert report['scenarios']['failing']['errors'] == 6
+        assert report['scenarios']['failing']['error_rate'] == 1.0
+        assert report['scenarios']['failing']['error_kinds'] == {'500': 6}
+
+    def test_setup_fails_without_data(self) -> None:
+        responses = {'/celebrations/': Response(200, [])}
+        with pytest.raises(ScenarioError, match="seed the database first"):
+            LoadTest(lambda: FakeClient(responses), [(ExpandedCelebration(), 1)], requests=1).run()
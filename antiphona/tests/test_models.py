@@ -1,4 +1,7 @@
+from unittest.mock import patch
+
 from django.core.exceptions import ValidationError
+from django.db import DatabaseError
 from django.test import TestCase
 import pytest
 
@@ -7,6 +10,7 @@ from antiphona.models import (
     Antiphona,
     Celebration,
     LiturgicalSeasons,
+    content_hash,
 )
 from antiphona.tests.factories.model_factories import AntiphonaFactory
 
@@ -91,3 +95,133 @@ class TestCelebration(TestCase):
         celebration.full_clean()
 
         assert list(celebration.antiphonas.all()) == [antiphona_1, antiphona_2]
+
+
+class TestAntiphonaContentHash(TestCase):
+
+    def test_hash_is_stored_on_create(self) -> None:
+        text = {"la": "Alleluia", "en_US": "Alleluia"}
+        link = "https://gregobase.selapa.net/chant.php?id=7911"
+
+        antiphona = Antiphona.objects.create(text=text, link=link)
+
+        assert antiphona.content_hash == content_hash(text, link)
+        assert Antiphona.objects.get(pk=antiphona.pk).content_hash == content_hash(text, link)
+
+    def test_hash_does_not_depend_on_key_order(self) -> None:
+        link = "https://gregobase.selapa.net/chant.php?id=7911"
+        assert content_hash({"la": "1", "en_US": "2"}, link) == content_hash({"en_US": "2", "la": "1"}, link)
+
+    def test_hash_changes_with_text_and_link(self) -> None:
+        link = "https://gregobase.selapa.net/chant.php?id=7911"
+        original = content_hash({"la": "1"}, link)
+        assert content_hash({"la": "2"}, link) != original
+        assert content_hash({"la": "1"}, link + "2") != original
+
+    def test_hash_is_updated_with_update_fields(self) -> None:
+        antiphona = AntiphonaFactory()
+        antiphona.text = {"la": "Another text"}
+        antiphona.save(update_fields=['text'])
+
+        expected = content_hash({"la": "Another text"}, antiphona.link)
+        assert Antiphona.objects.get(pk=antiphona.pk).content_hash == expected
+
+
+class TestAntiphonaUpsert(TestCase):
+
+    link = "https://gregobase.selapa.net/chant.php?id=7911"
+
+    def test_creates_when_link_is_new(self) -> None:
+        antiphona, status = Antiphona.objects.upsert(link=self.link, text={"la": "Alleluia"})
+
+        assert status == 'created'
+        assert Antiphona.objects.get(pk=antiphona.pk).text == {"la": "Alleluia"}
+
+    def test_skips_unchanged_content(self) -> None:
+        created = Antiphona.objects.create(link=self.link, text={"la": "Alleluia", "en_US": "Alleluia"})
+
+        with patch.object(Antiphona, 'save') as save:
+            antiphona, status = Antiphona.objects.upsert(link=self.link, text={"en_US": "Alleluia", "la": "Alleluia"})
+
+        assert status == 'unchanged'
+        assert antiphona.pk == created.pk
+        save.assert_not_called()
+
+    def test_updates_changed_content(self) -> None:
+        created = Antiphona.objects.create(link=self.link, text={"la": "Alleluia"})
+
+        antiphona, status = Antiphona.objects.upsert(link=self.link, text={"la": "Gloria"})
+
+        assert status == 'updated'
+        assert antiphona.pk == created.pk
+        assert Antiphona.objects.get(pk=created.pk).text == {"la": "Gloria"}
+
+    def test_bulk_upsert(self) -> None:
+        Antiphona.objects.create(link=self.link, text={"la": "Alleluia"})
+        Antiphona.objects.create(link=self.link + "1", text={"la": "Alleluia"})
+
+        counts = Antiphona.objects.bulk_upsert([
+            {'link': self.link, 'text': {"la": "Alleluia"}},
+            {'link': self.link + "1", 'text': {"la": "Gloria"}},
+            {'link': self.link + "2", 'text': {"la": "Sanctus"}},
+        ])
+
+        assert counts == {'unchanged': 1, 'updated': 1, 'created': 1}
+
+    def test_creates_once_when_another_writer_inserts_first(self) -> None:
+        created = Antiphona.objects.create(link=self.link, text={"la": "Alleluia"})
+
+        # Looked up before the other writer inserted the link
+        antiphona, status = Antiphona.objects.all()._upsert({}, self.link, {"la": "Gloria"})
+
+        assert status == 'updated'
+        assert antiphona.pk == created.pk
+        assert Antiphona.objects.filter(link=self.link).count() == 1
+
+    def test_links_are_unique(self) -> None:
+        Antiphona.objects.create(link=self.link, text={"la": "Alleluia"})
+
+        with pytest.raises(DatabaseError):
+            Antiphona.objects.create(link=self.link, text={"la": "Gloria"})
+
+    def test_upserts_need_a_link(self) -> None:
+        unrelated = Antiphona.objects.create(text={"la": "Alleluia"})
+
+        with pytest.raises(ValueError):
+            Antiphona.objects.upsert(link='', text={"la": "Gloria"})
+        with pytest.raises(ValueError):
+            Antiphona.objects.bulk_upsert([{'link': '', 'text': {"la": "Gloria"}}])
+
+        assert Antiphona.objects.get(pk=unrelated.pk).text == {"la": "Alleluia"}
+
+    def test_duplicates_leave_out_antiphonas_without_link(self) -> None:
+        Antiphona.objects.create()
+        Antiphona.objects.create()
+
+        assert all(duplicate['link'] for duplicate in Antiphona.objects.duplicates())
+
+    def test_antiphonas_without_link_are_not_unique(self) -> None:
+        Antiphona.objects.create()
+        Antiphona.objects.create()
+
+        assert Antiphona.objects.filter(link='').count() == 2
+
+    def test_duplicates_report_shared_links(self) -> None:
+        # Only data stored before links were unique can have duplicates
+        Antiphona.objects.mongo_drop_index('antiphona_link_uniq')
+        self.addCleanup(
+            Antiphona.objects.mongo_create_index,
+            'link',
+            unique=True,
+            partialFilterExpression={'link': {'$gt': ''}},
+            name='antiphona_link_uniq',
+        )
+        first = Antiphona.objects.create(link=self.link, text={"la": "Alleluia"})
+        second = Antiphona.objects.create(link=self.link, text={"la": "Gloria"})
+        self.addCleanup(Antiphona.objects.mongo_delete_many, {'link': self.link})
+
+        duplicates = [duplicate for duplicate in Antiphona.objects.duplicates() if duplicate['link'] == self.link]
+
+        assert len(duplicates) == 1
+        assert sorted(duplicates[0]['ids']) == [first.pk, second.pk]
+        assert sorted(duplicates[0]['content_hashes']) == sorted([first.content_hash, second.content_hash])
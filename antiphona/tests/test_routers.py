@@ -0,0 +1,100 @@
+from contextvars import copy_context
+from typing import (
+    Any,
+    Callable,
+)
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.db import router
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+)
+from django.test import (
+    TestCase,
+    override_settings,
+)
+
+from antiphona.middleware import PrimaryPinningMiddleware
+from antiphona.models import (
+    Antiphona,
+    Celebration,
+)
+from antiphona.routers import (
+    ReadReplicaRouter,
+    pinned_to_primary,
+)
+
+
+def run_unpinned(func: Callable, *args: Any) -> Any:
+    """Runs func as a fresh request would, whatever this test thread wrote before."""
+    context = copy_context()
+    context.run(pinned_to_primary.set, False)
+    return context.run(func, *args)
+
+
+@override_settings(ANTIPHONA_READ_DATABASE='read')
+class TestReadReplicaRouter(TestCase):
+
+    def setUp(self) -> None:
+        self.router = ReadReplicaRouter()
+
+    def test_reads_go_to_the_read_database(self) -> None:
+        assert run_unpinned(self.router.db_for_read, Antiphona) == 'read'
+
+    def test_writes_go_to_the_primary(self) -> None:
+        assert run_unpinned(self.router.db_for_write, Antiphona) == 'default'
+
+    def test_reads_stick_to_the_primary_after_a_write(self) -> None:
+        def write_then_read() -> str:
+            self.router.db_for_write(Antiphona)
+            return self.router.db_for_read(Celebration)
+
+        assert run_unpinned(write_then_read) == 'default'
+
+    def test_other_apps_are_left_to_the_primary(self) -> None:
+        assert run_unpinned(self.router.db_for_read, Session) is None
+        assert run_unpinned(router.db_for_read, Session) == 'default'
+        assert run_unpinned(router.db_for_read, User) == 'default'
+
+        def write_then_read() -> str:
+            self.router.db_for_write(Session)
+            return self.router.db_for_read(Antiphona)
+
+        # Saving the session does not pin the request
+        assert run_unpinned(write_then_read) == 'read'
+
+    @override_settings(ANTIPHONA_READ_DATABASE=None)
+    def test_reads_go_to_the_primary_without_a_read_database(self) -> None:
+        assert run_unpinned(self.router.db_for_read, Antiphona) == 'default'
+
+    def test_only_the_primary_is_migrated(self) -> None:
+        assert self.router.allow_migrate('default', 'antiphona')
+        assert not self.router.allow_migrate('read', 'antiphona')
+
+
+@override_settings(ANTIPHONA_READ_DATABASE='read')
+class TestPrimaryPinningMiddleware(TestCase):
+
+    def setUp(self) -> None:
+        self.router = ReadReplicaRouter()
+        self.reads: list[str] = []
+
+    def write_view(self, request: HttpRequest) -> HttpResponse:
+        self.router.db_for_write(Antiphona)
+        self.reads.append(self.router.db_for_read(Antiphona))
+        return HttpResponse()
+
+    def read_view(self, request: HttpRequest) -> HttpResponse:
+        self.reads.append(self.router.db_for_read(Antiphona))
+        return HttpResponse()
+
+    def test_pin_only_lasts_for_the_request(self) -> None:
+        def requests() -> None:
+            PrimaryPinningMiddleware(self.write_view)(HttpRequest())
+            PrimaryPinningMiddleware(self.read_view)(HttpRequest())
+
+        run_unpinned(requests)
+
+        assert self.reads == ['default', 'read']
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from antiphona.models import (
+    Antiphona,
+    Celebration,
+    LiturgicalSeasons,
+)
+from antiphona.tests.factories.model_factories import AntiphonaFactory
+
+
+class TestCelebrationSerializerUpdate(TestCase):
+
+    def setUp(self) -> None:
+        self.antiphona_1 = AntiphonaFactory()
+        self.antiphona_2 = AntiphonaFactory()
+        self.celebration = Celebration.objects.create(
+            name="Valid name",
+            liturgical_season=LiturgicalSeasons.ADVENT,
+            antiphonas=[self.antiphona_1],
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+
+    def antiphona_url(self, antiphona: AntiphonaFactory) -> str:
+        return f'http://testserver/antiphonas/{antiphona.pk}/'
+
+    def stored_antiphonas(self) -> set[int]:
+        return {antiphona.pk for antiphona in Celebration.objects.get(pk=self.celebration.pk).antiphonas.all()}
+
+    def test_put_replaces_the_antiphonas(self) -> None:
+        response = self.client.put(
+            f'/celebrations/{self.celebration.pk}/',
+            {
+                'name': "New name",
+                'liturgical_season': LiturgicalSeasons.LENT,
+                'antiphonas': [self.antiphona_url(self.antiphona_2)],
+            },
+            format='json',
+        )
+
+        assert response.status_code == 200
+        assert response.data['antiphonas'] == [self.antiphona_url(self.antiphona_2)]
+        assert self.stored_antiphonas() == {self.antiphona_2.pk}
+        assert Celebration.objects.get(pk=self.celebration.pk).name == "New name"
+
+    def test_patch_replaces_the_antiphonas(self) -> None:
+        response = self.client.patch(
+            f'/celebrations/{self.celebration.pk}/',
+            {'antiphonas': [self.antiphona_url(self.antiphona_1), self.antiphona_url(self.antiphona_2)]},
+            format='json',
+        )
+
+        assert response.status_code == 200
+        assert self.stored_antiphonas() == {self.antiphona_1.pk, self.antiphona_2.pk}
+
+    def test_patch_without_antiphonas_keeps_them(self) -> None:
+        response = self.client.patch(f'/celebrations/{self.celebration.pk}/', {'name': "New name"}, format='json')
+
+        assert response.status_code == 200
+        assert self.stored_antiphonas() == {self.antiphona_1.pk}
+
+
+class TestAntiphonaSerializer(TestCase):
+
+    link = "https://gregobase.selapa.net/chant.php?id=7911"
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+
+    def test_repeated_link_is_a_validation_error(self) -> None:
+        body = {'text': {"la": "Alleluia"}, 'link': self.link}
+
+        assert self.client.post('/antiphonas/', body, format='json').status_code == 201
+        response = self.client.post('/antiphonas/', body, format='json')
+
+        assert response.status_code == 400
+        assert 'link' in response.data
+
+    def test_own_link_can_be_kept(self) -> None:
+        antiphona = Antiphona.objects.create(link=self.link, text={"la": "Alleluia"})
+
+        response = self.client.put(
+            f'/antiphonas/{antiphona.pk}/',
+            {'text': {"la": "Gloria"}, 'link': self.link},
+            format='json',
+        )
+
+        assert response.status_code == 200
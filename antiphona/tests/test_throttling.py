@@ -0,0 +1,172 @@
+import asyncio
+import os
+import tempfile
+import time
+from typing import (
+    Any,
+    Optional,
+)
+
+from django.conf import settings
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from antiphona import throttling
+from antiphona.asgi import AsyncReadApplication
+from antiphona.loadtest.asgi import request
+from antiphona.tests.test_asgi import RecordingApplication
+from antiphona.throttling import (
+    GROUP_SIZE,
+    SharedBuckets,
+    SharedMemoryRateThrottle,
+    parse_rate,
+)
+
+
+class View:
+
+    def __init__(self, throttle_scope: Any = None) -> None:
+        self.throttle_scope = throttle_scope
+
+
+class TestParseRate(TestCase):
+
+    def test_parses_drf_rates(self) -> None:
+        assert parse_rate('100/min') == (100, 60)
+        assert parse_rate('5/s') == (5, 1)
+        assert parse_rate('1000/day') == (1000, 86400)
+
+
+class TestSharedBuckets(TestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'throttle')
+        self.buckets = SharedBuckets(self.path, slots=64)
+
+    def test_allows_up_to_capacity(self) -> None:
+        waits = [self.buckets.consume('client', capacity=3, duration=60, now=100.0) for _ in range(4)]
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3] == 20.0
+
+    def test_refills_over_time(self) -> None:
+        for _ in range(3):
+            self.buckets.consume('client', capacity=3, duration=60, now=100.0)
+
+        assert self.buckets.consume('client', capacity=3, duration=60, now=110.0) > 0
+        assert self.buckets.consume('client', capacity=3, duration=60, now=130.0) == 0.0
+
+    def test_buckets_stored_before_a_reboot_refill(self) -> None:
+        # Timestamps in the file outlive the process, so they must not come from a clock that restarts
+        an_hour_ago = time.time() - 3600
+        for _ in range(3):
+            self.buckets.consume('client', capacity=3, duration=60, now=an_hour_ago)
+
+        assert self.buckets.consume('client', capacity=3, duration=60) == 0.0
+
+    def test_keys_are_independent(self) -> None:
+        self.buckets.consume('client', capacity=1, duration=60, now=100.0)
+        assert self.buckets.consume('client', capacity=1, duration=60, now=100.0) > 0
+        assert self.buckets.consume('another client', capacity=1, duration=60, now=100.0) == 0.0
+
+    def test_state_is_shared_through_the_file(self) -> None:
+        other_process = SharedBuckets(self.path, slots=64)
+
+        self.buckets.consume('client', capacity=1, duration=60, now=100.0)
+
+        assert other_process.consume('client', capacity=1, duration=60, now=100.0) > 0
+
+    def test_full_group_evicts_least_recently_used(self) -> None:
+        buckets = SharedBuckets(self.path + '-single', slots=GROUP_SIZE)
+        for number in range(GROUP_SIZE):
+            buckets.consume(f'client {number}', capacity=1, duration=60, now=100.0 + number)
+
+        assert buckets.consume('newcomer', capacity=1, duration=60, now=200.0) == 0.0
+        # 'client 0' was evicted and starts over, the others are still tracked
+        assert buckets.consume('client 0', capacity=1, duration=60, now=200.0) == 0.0
+        assert buckets.consume(f'client {GROUP_SIZE - 1}', capacity=1, duration=60, now=100.0 + GROUP_SIZE) > 0
+
+
+class ThrottleTestCase(TestCase):
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        rest_framework = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'read': '2/min', 'write': '1/min', 'bulk': '1/hour'},
+        }
+        overrides = override_settings(
+            REST_FRAMEWORK=rest_framework,
+            ANTIPHONA_THROTTLE_PATH=os.path.join(directory.name, 'throttle'),
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+
+class TestSharedMemoryRateThrottle(ThrottleTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.factory = APIRequestFactory()
+
+    def allowed(self, method: str, view: Optional[View] = None) -> bool:
+        http_request = getattr(self.factory, method)('/antiphonas/', REMOTE_ADDR='10.0.0.1')
+        return SharedMemoryRateThrottle().allow_request(Request(http_request), view or View())
+
+    def test_reads_are_throttled(self) -> None:
+        assert [self.allowed('get') for _ in range(3)] == [True, True, False]
+
+    def test_writes_have_their_own_rate(self) -> None:
+        self.allowed('get')
+        self.allowed('get')
+
+        assert [self.allowed('post') for _ in range(2)] == [True, False]
+
+    def test_view_can_choose_the_scope(self) -> None:
+        view = View(throttle_scope='bulk')
+        assert [self.allowed('get', view) for _ in range(2)] == [True, False]
+        assert self.allowed('get')
+
+    def test_wait_is_reported(self) -> None:
+        throttle = SharedMemoryRateThrottle()
+        http_request = self.factory.post('/antiphonas/', REMOTE_ADDR='10.0.0.2')
+        throttle.allow_request(Request(http_request), View())
+
+        assert not throttle.allow_request(Request(http_request), View())
+        assert 0 < throttle.wait() <= 60
+
+
+class TestAsyncReadApplicationThrottling(ThrottleTestCase):
+
+    def test_throttled_reads_get_a_cheap_429(self) -> None:
+        throttling.check('read', 'ip:127.0.0.1')
+        throttling.check('read', 'ip:127.0.0.1')
+        inner = RecordingApplication()
+
+        status, data = asyncio.run(request(AsyncReadApplication(inner), '/antiphonas/', host=b'testserver'))
+
+        assert status == 429
+        assert 'Request was throttled' in data['detail']
+        assert inner.paths == []
+
+    def test_authenticated_reads_are_left_to_django(self) -> None:
+        # Django throttles them by user rather than by the address other clients may share
+        throttling.check('read', 'ip:127.0.0.1')
+        throttling.check('read', 'ip:127.0.0.1')
+        inner = RecordingApplication()
+
+        status, _ = asyncio.run(request(
+            AsyncReadApplication(inner),
+            '/antiphonas/',
+            host=b'testserver',
+            headers=[(b'authorization', b'Basic YTpi')],
+        ))
+
+        assert status == 204
+        assert inner.paths == ['/antiphonas/']
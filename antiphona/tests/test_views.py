@@ -0,0 +1,38 @@
+from django.contrib.auth.models import (
+    Permission,
+    User,
+)
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from antiphona.models import Antiphona
+
+
+class TestAntiphonaBulkUpsert(TestCase):
+
+    link = "https://gregobase.selapa.net/chant.php?id=7911"
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user('editor', 'editor@example.com', 'editor')
+        self.user.user_permissions.add(Permission.objects.get(codename='add_antiphona'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def bulk_upsert(self) -> int:
+        response = self.client.post(
+            '/antiphonas/bulk-upsert/',
+            [{'text': {"la": "Gloria"}, 'link': self.link}],
+            format='json',
+        )
+        return response.status_code
+
+    def test_needs_the_change_permission(self) -> None:
+        assert self.bulk_upsert() == 403
+
+    def test_updates_existing_links(self) -> None:
+        antiphona = Antiphona.objects.create(link=self.link, text={"la": "Alleluia"})
+        self.user.user_permissions.add(Permission.objects.get(codename='change_antiphona'))
+        self.client.force_authenticate(User.objects.get(pk=self.user.pk))
+
+        assert self.bulk_upsert() == 200
+        assert Antiphona.objects.get(pk=antiphona.pk).text == {"la": "Gloria"}
@@ -0,0 +1,146 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import (
+    Any,
+    Optional,
+)
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+# key, tokens left, last refill as a unix timestamp
+SLOT = struct.Struct('Qdd')
+# Slots a key may live in. A key missing from its group takes over the least recently used slot
+GROUP_SIZE = 4
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """Same format as DRF's SimpleRateThrottle: '100/min' gives (100, 60)."""
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+class SharedBuckets:
+    """
+    Token buckets in a memory mapped file, so every process on the host sees the same counts.
+
+    The file is a fixed table of slots and a key hashes to a group of ``GROUP_SIZE`` of them,
+    so a check costs the same however many clients there are. Groups are locked with fcntl
+    record locks between processes, and with a thread lock inside one.
+    """
+
+    def __init__(self, path: str, slots: int) -> None:
+        self.groups = max(slots // GROUP_SIZE, 1)
+        self.size = self.groups * GROUP_SIZE * SLOT.size
+        self.lock = threading.Lock()
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < self.size:
+                os.ftruncate(fd, self.size)
+            self.memory = mmap.mmap(fd, self.size)
+        except BaseException:
+            os.close(fd)
+            raise
+        self.fd = fd
+
+    @staticmethod
+    def hash(key: str) -> int:
+        # 0 marks an empty slot
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big') or 1
+
+    def consume(self, key: str, capacity: int, duration: float, now: Optional[float] = None) -> float:
+        """Takes a token from ``key``'s bucket. Returns 0 if there was one, or the seconds to wait for it."""
+        # Wall clock rather than monotonic: the file outlives reboots, which restart the monotonic clock
+        now = time.time() if now is None else now
+        refill_rate = capacity / duration
+        hashed = self.hash(key)
+        start = (hashed % self.groups) * GROUP_SIZE * SLOT.size
+
+        with self.lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, GROUP_SIZE * SLOT.size, start)
+            try:
+                offset, tokens, updated = self._find(hashed, start, capacity)
+                tokens = min(capacity, tokens + max(now - updated, 0.0) * refill_rate)
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / refill_rate
+                SLOT.pack_into(self.memory, offset, hashed, tokens, now)
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, GROUP_SIZE * SLOT.size, start)
+        return wait
+
+    def _find(self, hashed: int, start: int, capacity: int) -> tuple[int, float, float]:
+        oldest_offset, oldest_updated = start, float('inf')
+        for offset in range(start, start + GROUP_SIZE * SLOT.size, SLOT.size):
+            key, tokens, updated = SLOT.unpack_from(self.memory, offset)
+            if key == hashed:
+                return offset, tokens, updated
+            if key == 0:
+                return offset, float(capacity), 0.0
+            if updated < oldest_updated:
+                oldest_offset, oldest_updated = offset, updated
+        # Evicting gives the newcomer a full bucket
+        return oldest_offset, float(capacity), 0.0
+
+
+_buckets: dict[Any, SharedBuckets] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_buckets() -> SharedBuckets:
+    # Keyed by pid as well, so forked workers do not share a thread lock that may be held
+    key = (os.getpid(), settings.ANTIPHONA_THROTTLE_PATH, settings.ANTIPHONA_THROTTLE_SLOTS)
+    with _buckets_lock:
+        if key not in _buckets:
+            _buckets[key] = SharedBuckets(settings.ANTIPHONA_THROTTLE_PATH, settings.ANTIPHONA_THROTTLE_SLOTS)
+        return _buckets[key]
+
+
+def check(scope: str, ident: str) -> float:
+    """Returns 0 if ``ident`` may make a ``scope`` request now, or the seconds until it may."""
+    rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+    if rate is None:
+        return 0.0
+    capacity, duration = parse_rate(rate)
+    return get_buckets().consume(f'{scope}:{ident}', capacity, duration)
+
+
+class SharedMemoryRateThrottle(BaseThrottle):
+    """
+    Limits requests per client with the ``read``, ``write`` or ``bulk`` rate from
+    ``DEFAULT_THROTTLE_RATES``. Views choose ``bulk`` through ``throttle_scope``, otherwise
+    safe methods are reads and the rest are writes.
+    """
+
+    wait_time = 0.0
+
+    def get_scope(self, request: Request, view: Any) -> str:
+        scope = getattr(view, 'throttle_scope', None)
+        if scope:
+            return scope
+        return 'read' if request.method in SAFE_METHODS else 'write'
+
+    def get_client_ident(self, request: Request) -> str:
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request: Request, view: Any) -> bool:
+        self.wait_time = check(self.get_scope(request, view), self.get_client_ident(request))
+        return self.wait_time == 0
+
+    def wait(self) -> float:
+        return self.wait_time
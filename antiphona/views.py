@@ -1,16 +1,35 @@
+from typing import (
+    Any,
+    Optional,
+)
+
+from django.conf import settings
+from django.db import router
 from django.http import (
     HttpRequest,
     HttpResponse,
 )
-from rest_framework import viewsets
+from rest_framework import (
+    serializers,
+    status,
+    viewsets,
+)
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
 
+from antiphona import documents
 from antiphona.models import (
     Antiphona,
     Celebration,
 )
+from antiphona.permissions import UpsertPermissions
 from antiphona.serializers import (
     AntiphonaSerializer,
+    AntiphonaUpsertSerializer,
     CelebrationSerializer,
+    ExpandedCelebrationSerializer,
 )
 
 
@@ -21,8 +40,54 @@ def index(request: HttpRequest) -> HttpResponse:
 class AntiphonaViewSet(viewsets.ModelViewSet):
     queryset = Antiphona.objects.all()
     serializer_class = AntiphonaSerializer
+    throttle_scope: Optional[str] = None
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk-upsert',
+        throttle_scope='bulk',
+        serializer_class=AntiphonaUpsertSerializer,
+        permission_classes=[UpsertPermissions],
+    )
+    def bulk_upsert(self, request: Request) -> Response:
+        """Creates or updates antiphonas by link, skipping the ones whose content did not change."""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        counts = Antiphona.objects.bulk_upsert(serializer.validated_data)
+        return Response(
+            {key: counts[key] for key in ('created', 'updated', 'unchanged')},
+            status=status.HTTP_200_OK,
+        )
 
 
 class CelebrationViewSet(viewsets.ModelViewSet):
     queryset = Celebration.objects.all()
     serializer_class = CelebrationSerializer
+
+    @property
+    def expand(self) -> bool:
+        return self.request.query_params.get('expand') == 'antiphonas'
+
+    @property
+    def throttle_scope(self) -> Optional[str]:
+        # Expanded lists export the whole collection
+        if self.action == 'list' and self.expand:
+            return 'bulk'
+        return None
+
+    def get_serializer_class(self) -> type[serializers.BaseSerializer]:
+        if self.action in ('list', 'retrieve') and self.expand:
+            return ExpandedCelebrationSerializer
+        return super().get_serializer_class()
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        pk = str(kwargs.get('pk', ''))
+        if self.expand and settings.ANTIPHONA_CELEBRATION_DOCUMENTS and pk.isdigit():
+            document = documents.get_document(int(pk), router.db_for_read(Celebration))
+            if document is not None:
+                return Response(documents.representation(
+                    document,
+                    lambda view_name, value: reverse(view_name, kwargs={'pk': value}, request=request),
+                ))
+        return super().retrieve(request, *args, **kwargs)
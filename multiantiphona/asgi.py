@@ -2,6 +2,8 @@
 ASGI config for multiantiphona project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+JSON reads of antiphonas and celebrations are answered by ``antiphona.asgi``
+without a sync thread, everything else is handled by Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
@@ -13,4 +15,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'multiantiphona.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from antiphona.asgi import AsyncReadApplication  # noqa: E402 isort:skip
+
+application = AsyncReadApplication(django_application)
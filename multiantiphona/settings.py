@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 
 import os
+from typing import Optional
 
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'antiphona.middleware.PrimaryPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -76,13 +78,38 @@ WSGI_APPLICATION = 'multiantiphona.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
+MONGO_CLIENT = {
+    'host': os.environ.get('MONGO_HOST', 'localhost'),
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'djongo',
         'NAME': 'multiantiphona',
+        'CLIENT': MONGO_CLIENT,
     },
 }
 
+# Reads go to a second connection when a read preference is given, e.g. against a local replica set:
+# MONGO_HOST='mongodb://localhost:27017,localhost:27018/?replicaSet=rs0' MONGO_READ_PREFERENCE=secondaryPreferred
+ANTIPHONA_READ_DATABASE: Optional[str] = None
+
+if os.environ.get('MONGO_READ_PREFERENCE'):
+    ANTIPHONA_READ_DATABASE = 'read'
+    DATABASES[ANTIPHONA_READ_DATABASE] = {
+        'ENGINE': 'djongo',
+        'NAME': 'multiantiphona',
+        'CLIENT': {
+            **MONGO_CLIENT,
+            'readPreference': os.environ['MONGO_READ_PREFERENCE'],
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+
+DATABASE_ROUTERS = ['antiphona.routers.ReadReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -132,4 +159,33 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly',
     ],
+    # Token buckets shared by every process on the host, see antiphona.throttling
+    'DEFAULT_THROTTLE_CLASSES': [
+        'antiphona.throttling.SharedMemoryRateThrottle',
+    ],
+    # Raised through the environment for load tests, e.g. ANTIPHONA_THROTTLE_READ=100000/min
+    'DEFAULT_THROTTLE_RATES': {
+        'read': os.environ.get('ANTIPHONA_THROTTLE_READ', '600/min'),
+        'write': os.environ.get('ANTIPHONA_THROTTLE_WRITE', '60/min'),
+        'bulk': os.environ.get('ANTIPHONA_THROTTLE_BULK', '10/min'),
+    },
 }
+
+
+# Antiphona
+
+# Threads, and Mongo connections, serving the async read path in antiphona.asgi
+ANTIPHONA_ASYNC_READ_WORKERS = 16
+
+# Antiphona ids looked up per concurrent query when expanding celebrations
+ANTIPHONA_EXPAND_CHUNK_SIZE = 100
+
+# Keep a denormalized document per celebration with its antiphonas embedded, see antiphona.documents
+ANTIPHONA_CELEBRATION_DOCUMENTS = False
+
+# Memory mapped file holding the throttling buckets, and how many clients it can track at once
+ANTIPHONA_THROTTLE_PATH = os.environ.get(
+    'ANTIPHONA_THROTTLE_PATH',
+    '/dev/shm/multiantiphona-throttle' if os.path.isdir('/dev/shm') else '/tmp/multiantiphona-throttle',
+)
+ANTIPHONA_THROTTLE_SLOTS = 65536